@@ -8,9 +8,11 @@ import os
 import sys
 import logging
 import json
-import glob
-import subprocess
+import copy
 import threading
+import queue
+import hashlib
+import shutil
 import time
 from datetime import datetime
 from werkzeug.utils import secure_filename
@@ -42,7 +44,8 @@ DEFAULT_CONFIG = {
         "height": 480,
         "rotation": 0,
         "slideshow_interval": 60,  # seconds
-        "transition_effect": "fade"
+        "transition_effect": "fade",
+        "prerender": True  # write display-sized copies at upload time
     },
     "photos": {
         "directory": "photos",
@@ -56,23 +59,27 @@ DEFAULT_CONFIG = {
     }
 }
 
+def _deep_default(cfg, defaults):
+    """Fill in any keys missing from cfg with values from defaults, recursively"""
+    for key, value in defaults.items():
+        if isinstance(value, dict):
+            _deep_default(cfg.setdefault(key, {}), value)
+        else:
+            cfg.setdefault(key, value)
+    return cfg
+
 # Load configuration
 def load_config():
     if os.path.exists(CONFIG_FILE):
         with open(CONFIG_FILE, 'r') as f:
             config = json.load(f)
             # Merge with defaults to ensure all keys exist
-            for key in DEFAULT_CONFIG:
-                if key not in config:
-                    config[key] = DEFAULT_CONFIG[key]
-                else:
-                    for subkey in DEFAULT_CONFIG[key]:
-                        if subkey not in config[key]:
-                            config[key][subkey] = DEFAULT_CONFIG[key][subkey]
-            return config
+            # Merge from a copy so later config updates never mutate DEFAULT_CONFIG
+            return _deep_default(config, copy.deepcopy(DEFAULT_CONFIG))
     else:
-        save_config(DEFAULT_CONFIG)
-        return DEFAULT_CONFIG
+        config = copy.deepcopy(DEFAULT_CONFIG)
+        save_config(config)
+        return config
 
 def save_config(config):
     with open(CONFIG_FILE, 'w') as f:
@@ -84,15 +91,33 @@ config = load_config()
 # Setup upload directory
 UPLOAD_FOLDER = config['photos']['directory']
 ALLOWED_EXTENSIONS = set(config['photos']['allowed_extensions'])
+_ALLOWED_SUFFIXES = tuple('.' + ext.lower() for ext in ALLOWED_EXTENSIONS)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = config['photos']['max_upload_size_mb'] * 1024 * 1024
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(os.path.join(UPLOAD_FOLDER, 'thumbnails'), exist_ok=True)
 
+# Cached /api/photos payload, keyed on the photo directory mtimes
+_photos_cache = {'mtime': None, 'payload': None, 'index': None}
+_photos_cache_lock = threading.Lock()
+
+# MD5 digests of existing photos, keyed by (path, size, mtime)
+_hash_cache = {}
+
+# Cached system status probes (see get_system_probes)
+STATUS_CACHE_TTL = 2.0
+_status_cache = {'ts': 0.0, 'value': None}
+_status_cache_lock = threading.Lock()
+_temp_file = None
+
+def invalidate_photos_cache():
+    """Force the next photo listing to rescan the upload folder"""
+    with _photos_cache_lock:
+        _photos_cache['mtime'] = None
+
 def allowed_file(filename):
     """Check if the file extension is allowed"""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return filename.lower().endswith(_ALLOWED_SUFFIXES)
 
 #
 # Routes
@@ -107,41 +132,8 @@ def index():
 def get_photos():
     """Get a list of all photos"""
     try:
-        photos = []
-        # Get all photos
-        for ext in ALLOWED_EXTENSIONS:
-            photos.extend(glob.glob(os.path.join(app.config['UPLOAD_FOLDER'], f'*.{ext}')))
-        
-        # Get all thumbnails
-        thumbnails = {}
-        for ext in ['jpg', 'jpeg', 'png']:
-            for thumb in glob.glob(os.path.join(app.config['UPLOAD_FOLDER'], 'thumbnails', f'*.{ext}')):
-                basename = os.path.basename(thumb)
-                name = os.path.splitext(basename)[0]
-                thumbnails[name] = f'/photos/thumbnails/{basename}'
-        
-        # Format the response
-        result = []
-        for photo in photos:
-            basename = os.path.basename(photo)
-            name = os.path.splitext(basename)[0]
-            photo_url = f'/photos/{basename}'
-            
-            # Find matching thumbnail or use the photo itself
-            thumbnail_url = thumbnails.get(name, photo_url)
-            
-            result.append({
-                'id': name,
-                'name': basename,
-                'url': photo_url,
-                'thumbnail': thumbnail_url,
-                'date_added': datetime.fromtimestamp(os.path.getctime(photo)).isoformat()
-            })
-        
-        # Sort by date added (newest first)
-        result.sort(key=lambda x: x['date_added'], reverse=True)
-        
-        return jsonify({'photos': result})
+        payload, _ = load_photo_listing()
+        return jsonify(payload)
     except Exception as e:
         logger.error(f"Error getting photos: {e}")
         return jsonify({'error': 'Failed to get photos'}), 500
@@ -164,12 +156,37 @@ def upload_photo():
             # Secure the filename to prevent path traversal
             filename = secure_filename(file.filename)
             
-            # Save the uploaded file
             file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(file_path)
             
-            # Generate thumbnail
-            generate_thumbnail(file_path)
+            # Skip re-uploads of an identical file: compare sizes first and
+            # only hash when they collide
+            if is_duplicate_upload(file, file_path):
+                logger.info(f"Skipping duplicate upload: {filename}")
+                return jsonify({
+                    'success': True,
+                    'duplicate': True,
+                    'message': 'File already exists',
+                    'filename': filename
+                })
+            
+            # Stream the upload straight to disk in 1MB chunks, then move it
+            # into place so readers never see a partial file
+            part_path = file_path + '.part'
+            try:
+                with open(part_path, 'wb') as dst:
+                    shutil.copyfileobj(file.stream, dst, length=1 << 20)
+                os.replace(part_path, file_path)
+            except BaseException:
+                # Client disconnect, disk full, ...: don't leave the partial file behind
+                try:
+                    os.unlink(part_path)
+                except OSError:
+                    pass
+                raise
+            
+            # Queue thumbnail generation so the response isn't held up by PIL
+            invalidate_photos_cache()
+            _thumb_queue.put(file_path)
             
             return jsonify({
                 'success': True,
@@ -189,27 +206,27 @@ def delete_photo(photo_id):
         # Prevent path traversal
         photo_id = secure_filename(photo_id)
         
-        # Find the photo file
-        photo_paths = []
-        for ext in ALLOWED_EXTENSIONS:
-            photo_path = os.path.join(app.config['UPLOAD_FOLDER'], f'{photo_id}.{ext}')
-            if os.path.exists(photo_path):
-                photo_paths.append(photo_path)
-        
-        # Find the thumbnail
-        thumb_paths = []
-        for ext in ['jpg', 'jpeg', 'png']:
-            thumb_path = os.path.join(app.config['UPLOAD_FOLDER'], 'thumbnails', f'{photo_id}.{ext}')
-            if os.path.exists(thumb_path):
-                thumb_paths.append(thumb_path)
+        # Resolve the photo and its thumbnail from the cached listing index
+        _, photos_index = load_photo_listing()
+        paths = photos_index.get(photo_id)
         
-        if not photo_paths:
+        if not paths:
             return jsonify({'error': 'Photo not found'}), 404
         
+        # Also drop the display-sized copy for the current geometry
+        display = config['display']
+        paths = paths + [prerender_path(path, display['width'], display['height'],
+                                        display.get('rotation', 0))
+                         for path in paths if os.path.dirname(path) == app.config['UPLOAD_FOLDER']]
+        
         # Delete the files
-        for path in photo_paths + thumb_paths:
-            os.remove(path)
-            logger.info(f"Deleted file: {path}")
+        for path in paths:
+            try:
+                os.remove(path)
+                logger.info(f"Deleted file: {path}")
+            except FileNotFoundError:
+                pass
+        invalidate_photos_cache()
         
         return jsonify({'success': True, 'message': 'Photo deleted successfully'})
     except Exception as e:
@@ -253,31 +270,8 @@ def update_config():
 def get_system_status():
     """Get system status information"""
     try:
-        # Get disk usage
-        total, used, free = 0, 0, 0
-        try:
-            import shutil
-            total, used, free = shutil.disk_usage('/')
-        except:
-            pass
-        
-        # Get CPU temperature (Raspberry Pi specific)
-        cpu_temp = 'N/A'
-        try:
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                cpu_temp = str(float(f.read()) / 1000) + '°C'
-        except:
-            pass
-        
-        # Check if display process is running
-        display_running = False
-        try:
-            # Check if our display process is running
-            result = subprocess.run(['pgrep', '-f', 'display_slideshow.py'], 
-                                  capture_output=True, text=True)
-            display_running = bool(result.stdout.strip())
-        except:
-            pass
+        # Disk, temperature and display probes are cached for a couple of seconds
+        (total, used, free), cpu_temp, display_running = get_system_probes()
         
         # Format disk space
         def format_size(size_bytes):
@@ -299,7 +293,7 @@ def get_system_status():
             },
             'cpu_temp': cpu_temp,
             'display_running': display_running,
-            'photo_count': len(glob.glob(os.path.join(app.config['UPLOAD_FOLDER'], '*.*'))),
+            'photo_count': count_photos(),
             'timestamp': datetime.now().isoformat()
         }
         
@@ -308,19 +302,195 @@ def get_system_status():
         logger.error(f"Error getting system status: {e}")
         return jsonify({'error': 'Failed to get system status'}), 500
 
+def send_versioned_file(directory, filename, max_age):
+    """Send a file that may be replaced under the same name. Listing URLs carry
+    ?v=<mtime>, so a changed file gets a new URL and those can be cached for
+    max_age; any other request must revalidate (cheap via ETag/304)."""
+    response = send_from_directory(directory, filename, conditional=True,
+                                   max_age=max_age if 'v' in request.args else None)
+    if 'v' not in request.args:
+        response.cache_control.no_cache = True
+    return response
+
 @app.route('/photos/<path:filename>')
 def serve_photo(filename):
     """Serve photo files"""
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    return send_versioned_file(app.config['UPLOAD_FOLDER'], filename, 86400)
+
+@app.route('/photos/thumbnails/<path:filename>')
+def serve_thumbnail(filename):
+    """Serve thumbnail files"""
+    return send_versioned_file(os.path.join(app.config['UPLOAD_FOLDER'], 'thumbnails'), filename, 604800)
 
 # Helper functions
+def load_photo_listing():
+    """Return the (payload, index) photo listing, rescanning only when stale"""
+    upload_folder = app.config['UPLOAD_FOLDER']
+    thumb_dir = os.path.join(upload_folder, 'thumbnails')
+    
+    # Directory mtimes change on every add/remove, so they key the cache
+    cache_key = (os.stat(upload_folder).st_mtime_ns,
+                 os.stat(thumb_dir).st_mtime_ns if os.path.isdir(thumb_dir) else None)
+    
+    with _photos_cache_lock:
+        if _photos_cache['mtime'] == cache_key:
+            return _photos_cache['payload'], _photos_cache['index']
+    
+    photos, index = build_photo_list(upload_folder, thumb_dir)
+    payload = {'photos': photos}
+    
+    with _photos_cache_lock:
+        _photos_cache['mtime'] = cache_key
+        _photos_cache['payload'] = payload
+        _photos_cache['index'] = index
+    
+    return payload, index
+
+def build_photo_list(upload_folder, thumb_dir):
+    """Scan the upload folder and return photo records (newest first) and
+    an index mapping each photo id to the files backing it"""
+    # Get all photos in a single directory pass; DirEntry caches the stat
+    with os.scandir(upload_folder) as it:
+        photos = [(e.name, e.stat(follow_symlinks=False)) for e in it
+                  if e.is_file(follow_symlinks=False) and e.name.lower().endswith(_ALLOWED_SUFFIXES)]
+    
+    # Sort by date added (newest first) on the raw ctime
+    photos.sort(key=lambda t: t[1].st_ctime, reverse=True)
+    
+    # Get all thumbnails (generate_thumbnail always writes .jpg) with their
+    # mtimes, which version the URLs
+    thumb_names = {}
+    if os.path.isdir(thumb_dir):
+        with os.scandir(thumb_dir) as it:
+            thumb_names = {os.path.splitext(e.name)[0]: e.stat().st_mtime_ns
+                           for e in it if e.name.endswith('.jpg')}
+    
+    # Format the response
+    result = []
+    index = {}
+    for basename, st in photos:
+        name = os.path.splitext(basename)[0]
+        # Versioned by mtime so a same-name replacement isn't served from cache
+        photo_url = f'/photos/{basename}?v={st.st_mtime_ns}'
+        index.setdefault(name, []).append(os.path.join(upload_folder, basename))
+        
+        # Find matching thumbnail or use the photo itself
+        if name in thumb_names:
+            thumbnail_url = f'/photos/thumbnails/{name}.jpg?v={thumb_names[name]}'
+            thumb_path = os.path.join(thumb_dir, f'{name}.jpg')
+            if thumb_path not in index[name]:
+                index[name].append(thumb_path)
+        else:
+            thumbnail_url = photo_url
+        
+        result.append({
+            'id': name,
+            'name': basename,
+            'url': photo_url,
+            'thumbnail': thumbnail_url,
+            'date_added': datetime.fromtimestamp(st.st_ctime).isoformat()
+        })
+    
+    return result, index
+
+def count_photos():
+    """Count the photos in the upload folder with a single directory pass"""
+    with os.scandir(app.config['UPLOAD_FOLDER']) as it:
+        return sum(1 for entry in it
+                   if entry.is_file() and entry.name.lower().endswith(_ALLOWED_SUFFIXES))
+
+def _read_cpu_temp():
+    """Read the CPU temperature, keeping the sysfs file open between calls"""
+    global _temp_file
+    try:
+        if _temp_file is None:
+            _temp_file = open('/sys/class/thermal/thermal_zone0/temp', 'r')
+        _temp_file.seek(0)
+        return str(float(_temp_file.read()) / 1000) + '°C'
+    except:
+        _temp_file = None
+        return 'N/A'
+
+def _is_display_running():
+    """Check if our display process is running by scanning /proc directly"""
+    try:
+        pids = os.listdir('/proc')
+    except OSError:
+        return False
+    
+    for pid in pids:
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                if b'display_slideshow.py' in f.read():
+                    return True
+        except OSError:
+            continue
+    return False
+
+def get_system_probes():
+    """Return (disk_usage, cpu_temp, display_running), cached for STATUS_CACHE_TTL seconds"""
+    with _status_cache_lock:
+        now = time.monotonic()
+        if _status_cache['value'] is not None and now - _status_cache['ts'] < STATUS_CACHE_TTL:
+            return _status_cache['value']
+        
+        try:
+            disk = shutil.disk_usage('/')
+        except:
+            disk = (0, 0, 0)
+        
+        value = (tuple(disk), _read_cpu_temp(), _is_display_running())
+        _status_cache['ts'] = now
+        _status_cache['value'] = value
+        return value
+
+def _md5_stream(stream, chunk_size=64 * 1024):
+    """Hash a binary stream in chunks without reading it fully into memory"""
+    md5 = hashlib.md5()
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        md5.update(chunk)
+    return md5.hexdigest()
+
+def _file_md5(path, size, mtime):
+    """Return the MD5 of a file on disk, cached by (path, size, mtime)"""
+    key = (path, size, mtime)
+    digest = _hash_cache.get(key)
+    if digest is None:
+        with open(path, 'rb') as f:
+            digest = _md5_stream(f)
+        _hash_cache[key] = digest
+    return digest
+
+def is_duplicate_upload(file, file_path):
+    """Check whether an uploaded file is identical to the one at file_path"""
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        return False
+    
+    stream = file.stream
+    stream.seek(0, os.SEEK_END)
+    upload_size = stream.tell()
+    stream.seek(0)
+    if upload_size != st.st_size:
+        return False
+    
+    try:
+        upload_digest = _md5_stream(stream)
+    finally:
+        stream.seek(0)
+    return upload_digest == _file_md5(file_path, st.st_size, st.st_mtime_ns)
+
 def generate_thumbnail(image_path, size=(200, 200)):
     """Generate a thumbnail for the web interface"""
     try:
         from PIL import Image
         
-        # Open the image
+        # Open the image; for JPEGs let libjpeg decode at reduced scale
         image = Image.open(image_path)
+        image.draft('RGB', size)
         
         # Generate thumbnail path
         filename = os.path.basename(image_path)
@@ -330,10 +500,12 @@ def generate_thumbnail(image_path, size=(200, 200)):
         thumb_path = os.path.join(thumb_dir, f"{name}.jpg")
         
         # Create thumbnail
-        image.thumbnail(size, Image.Resampling.LANCZOS)
+        image.thumbnail(size, Image.Resampling.BILINEAR)
         
         # Save the thumbnail
-        image.convert('RGB').save(thumb_path, format="JPEG", quality=85)
+        # Pin the fastest encoder path: baseline, no Huffman optimisation, 4:2:0
+        image.convert('RGB').save(thumb_path, format="JPEG", quality=85,
+                                  optimize=False, progressive=False, subsampling=2)
         logger.info(f"Thumbnail generated: {thumb_path}")
         
         return thumb_path
@@ -341,6 +513,52 @@ def generate_thumbnail(image_path, size=(200, 200)):
         logger.error(f"Error generating thumbnail: {e}")
         return None
 
+def prerender_path(image_path, width, height, rotation):
+    """Path of the display-sized copy of a photo for the given geometry"""
+    return os.path.join(os.path.dirname(image_path), '.display', f"{width}x{height}_r{rotation}",
+                        f"{os.path.basename(image_path)}.jpg")
+
+def prerender_display(image_path, width, height, rotation):
+    """Write a letterboxed, pre-rotated display-sized JPEG for the slideshow"""
+    try:
+        from PIL import Image, ImageOps
+        
+        out_path = prerender_path(image_path, width, height, rotation)
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        
+        image = Image.open(image_path)
+        image.draft('RGB', (width, height))
+        image = image.convert('RGB')
+        if rotation:
+            image = image.rotate(-rotation, expand=True)
+        
+        image = ImageOps.pad(image, (width, height), Image.Resampling.LANCZOS, color=(0, 0, 0))
+        image.save(out_path, format="JPEG", quality=90)
+        logger.info(f"Display copy generated: {out_path}")
+        
+        return out_path
+    except Exception as e:
+        logger.error(f"Error generating display copy: {e}")
+        return None
+
+def _thumbnail_worker():
+    """Drain the thumbnail queue in the background"""
+    while True:
+        image_path = _thumb_queue.get()
+        try:
+            generate_thumbnail(image_path)
+            display = config['display']
+            if display.get('prerender', True):
+                prerender_display(image_path, display['width'], display['height'],
+                                  display.get('rotation', 0))
+            invalidate_photos_cache()
+        finally:
+            _thumb_queue.task_done()
+
+# Background thumbnail generation
+_thumb_queue = queue.Queue()
+threading.Thread(target=_thumbnail_worker, name='thumbnail-worker', daemon=True).start()
+
 # Start the application
 if __name__ == '__main__':
     port = config['system'].get('web_port', 5000)
@@ -8,6 +8,9 @@ import os
 import sys
 import subprocess
 import logging
+import json
+import grp
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
@@ -79,6 +82,39 @@ def check_sdl_info():
         return
     print()
 
+# Probe a single SDL video driver in a fresh interpreter; prints a JSON result
+DRIVER_PROBE_SCRIPT = """
+import json, os
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+result = {'ok': False}
+try:
+    import pygame
+    pygame.display.init()
+    info = pygame.display.Info()
+    result.update(ok=True, width=info.current_w, height=info.current_h, hw=info.hw)
+    try:
+        pygame.display.set_mode((320, 240))
+        result['surface'] = True
+    except Exception as e:
+        result['surface_error'] = str(e)
+    pygame.display.quit()
+except Exception as e:
+    result['error'] = str(e)
+print(json.dumps(result))
+"""
+
+def probe_video_driver(driver, timeout=15):
+    """Initialize pygame with one SDL driver in a subprocess and report the result"""
+    env = dict(os.environ, SDL_VIDEODRIVER=driver)
+    try:
+        proc = subprocess.run([sys.executable, '-c', DRIVER_PROBE_SCRIPT],
+                              capture_output=True, text=True, env=env, timeout=timeout)
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+    except subprocess.TimeoutExpired:
+        return {'ok': False, 'error': f'timed out after {timeout}s'}
+    except Exception as e:
+        return {'ok': False, 'error': str(e)}
+
 def test_video_drivers():
     """Test each video driver"""
     logger.info("=== Testing Video Drivers ===")
@@ -91,30 +127,35 @@ def test_video_drivers():
     
     drivers_to_test = ['kmsdrm', 'fbdev', 'x11', 'wayland', 'directfb', 'dummy']
     
+    # Skip drivers that cannot work without their display server
+    skipped = set()
+    if not os.environ.get('DISPLAY'):
+        skipped.add('x11')
+    if not os.environ.get('WAYLAND_DISPLAY'):
+        skipped.add('wayland')
+    to_probe = [d for d in drivers_to_test if d not in skipped]
+    
+    # Each probe runs in its own process, so total time is the slowest driver
+    with ThreadPoolExecutor(max_workers=len(to_probe)) as pool:
+        results = dict(zip(to_probe, pool.map(probe_video_driver, to_probe)))
+    
     for driver in drivers_to_test:
         logger.info(f"\nTesting driver: {driver}")
-        os.environ['SDL_VIDEODRIVER'] = driver
+        if driver in skipped:
+            logger.info(f"  - Driver '{driver}' skipped (no display server)")
+            continue
         
-        try:
-            pygame.display.quit()
-            pygame.display.init()
-            
-            # Try to get display info
-            info = pygame.display.Info()
+        result = results[driver]
+        if result.get('ok'):
             logger.info(f"  ✓ Driver '{driver}' initialized")
-            logger.info(f"    Display size: {info.current_w}x{info.current_h}")
-            logger.info(f"    Hardware accelerated: {info.hw}")
-            
-            # Try to create a small test surface
-            try:
-                screen = pygame.display.set_mode((320, 240))
+            logger.info(f"    Display size: {result['width']}x{result['height']}")
+            logger.info(f"    Hardware accelerated: {result['hw']}")
+            if result.get('surface'):
                 logger.info(f"    ✓ Created test surface")
-                pygame.display.quit()
-            except Exception as e:
-                logger.warning(f"    Could not create surface: {e}")
-                
-        except Exception as e:
-            logger.error(f"  ✗ Driver '{driver}' failed: {e}")
+            else:
+                logger.warning(f"    Could not create surface: {result.get('surface_error')}")
+        else:
+            logger.error(f"  ✗ Driver '{driver}' failed: {result.get('error')}")
     
     print()
 
@@ -162,6 +203,16 @@ def check_display_manager():
         logger.info("No X11 DISPLAY set - good for framebuffer operation")
     print()
 
+def get_group_names():
+    """Return the names of the groups this process belongs to"""
+    names = set()
+    for gid in set(os.getgroups()) | {os.getgid()}:
+        try:
+            names.add(grp.getgrgid(gid).gr_name)
+        except KeyError:
+            pass
+    return names
+
 def suggest_fixes():
     """Suggest potential fixes based on diagnostics"""
     logger.info("=== Suggested Fixes ===")
@@ -169,10 +220,11 @@ def suggest_fixes():
     suggestions = []
     
     # Check if running as root or with proper groups
-    if 'video' not in subprocess.run(['groups'], capture_output=True, text=True).stdout:
+    group_names = get_group_names()
+    if 'video' not in group_names:
         suggestions.append("Add user to video group: sudo usermod -a -G video $USER")
     
-    if 'render' not in subprocess.run(['groups'], capture_output=True, text=True).stdout:
+    if 'render' not in group_names:
         suggestions.append("Add user to render group: sudo usermod -a -G render $USER")
     
     # Check for framebuffer
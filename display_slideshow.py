@@ -7,16 +7,27 @@ Supports full-color display, rotation control, and touch navigation.
 import os
 import sys
 import json
-import glob
 import time
 import logging
 import random
 import threading
+import mmap
+import struct
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import pygame
 from PIL import Image
 
+# inotify lets us rescan only when the photo directory actually changes
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+    INOTIFY_AVAILABLE = True
+except ImportError:
+    INOTIFY_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -29,6 +40,66 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Photos decoded ahead on each side of the current one; the wider window
+# only pays off when there is enough time between advances to fill it
+PREFETCH_WORKERS = 2
+PREFETCH_NEAR = (0, 1, -1)
+PREFETCH_WIDE = (0, 1, -1, 2, -2)
+PREFETCH_WIDE_MIN_INTERVAL = 10  # seconds
+
+# Timer events that drive the slideshow instead of polling
+ADVANCE_EVENT = pygame.USEREVENT + 1
+RELOAD_EVENT = pygame.USEREVENT + 2
+PHOTO_RELOAD_INTERVAL = 300  # seconds
+
+# On-disk cache of display-ready pixels, kept under the photo directory.
+# Stored as BGRA, the byte order of a little-endian 32-bit framebuffer, so
+# converting a mapped entry to the screen format is a straight copy.
+DISPLAY_CACHE_DIR = '.cache'
+DISPLAY_CACHE_EXT = '.bgra'
+DISPLAY_CACHE_FORMAT = 'BGRA'
+DISPLAY_CACHE_MAX_ENTRIES = 200
+# Header: width, height, x, y of the cached image
+DISPLAY_CACHE_HEADER = struct.Struct('<HHhh')
+
+def _make_scaler(width, height, rotation, fit_mode):
+    """Build a scaling function specialised for a fixed display geometry.
+    
+    The returned function takes a decoded Surface and returns
+    (scaled surface, blit position). Rotation and fit mode are resolved
+    here once instead of on every image.
+    """
+    def size_contain(w, h):
+        # Fit inside the display, letterboxing the short side
+        if w * height > h * width:
+            return width, h * width // w
+        return w * height // h, height
+    
+    def size_cover(w, h):
+        # Fill the display; the overflow is clipped when blitting
+        if w * height > h * width:
+            return w * height // h, height
+        return width, h * width // w
+    
+    target_size = size_cover if fit_mode == 'cover' else size_contain
+    smoothscale = pygame.transform.smoothscale
+    
+    def scale(surface):
+        new_width, new_height = target_size(*surface.get_size())
+        return (smoothscale(surface, (new_width, new_height)),
+                ((width - new_width) // 2, (height - new_height) // 2))
+    
+    if not rotation:
+        return scale
+    
+    rotate = pygame.transform.rotate
+    angle = -rotation
+    
+    def rotate_and_scale(surface):
+        return scale(rotate(surface, angle))
+    
+    return rotate_and_scale
+
 class PhotoSlideshow:
     """Manages photo slideshow on DSI display with touch controls"""
     
@@ -38,14 +109,16 @@ class PhotoSlideshow:
         self.running = False
         self.current_photo_index = 0
         self.photos = []
-        self.last_photo_update = 0
         self.screen = None
         self.clock = None
+        self._last_image_rect = None
+        self._black_surfaces = {}
         
         # Display settings
         self.width = self.config['display']['width']
         self.height = self.config['display']['height']
         self.rotation = self.config['display']['rotation']
+        self.fit_mode = self.config['display'].get('fit_mode', 'contain')
         self.slideshow_interval = self.config['display']['slideshow_interval']
         self.enable_touch = self.config['system']['enable_touch']
         
@@ -58,6 +131,27 @@ class PhotoSlideshow:
         self.swipe_start_pos = None
         self.swipe_start_time = None
         
+        # Rotation + scaling function specialised for this display
+        self._scale = _make_scaler(self.width, self.height, self.rotation, self.fit_mode)
+        # Smallest decode size that still fills the display before rotation
+        self._draft_size = (self.height, self.width) if self.rotation % 180 else (self.width, self.height)
+        
+        # Use display-sized copies written by the web app at upload time
+        # (those are letterboxed, so only valid in contain mode)
+        self.use_prerendered = (self.config['display'].get('prerender', True)
+                                and self.fit_mode == 'contain')
+        
+        # Photo directory mtime at the last scan, to skip unchanged rescans
+        self._photo_dir_mtime = None
+        
+        # Background decode of neighbouring photos (path -> Future of prepared image)
+        self._pool = None
+        self._pending = {}
+        # Screen-format surfaces for the same window (main thread only)
+        self._converted = {}
+        # Held while a display cache eviction runs, so only one scans at a time
+        self._evict_lock = threading.Lock()
+        
     def load_config(self, config_file):
         """Load configuration from file"""
         try:
@@ -116,15 +210,27 @@ class PhotoSlideshow:
     
     def load_photos(self):
         """Load list of photos from directory"""
-        self.photos = []
-        
         try:
-            for ext in self.allowed_extensions:
-                pattern = os.path.join(self.photo_dir, f'*.{ext}')
-                self.photos.extend(glob.glob(pattern))
+            # Nothing was added, removed or renamed since the last scan
+            dir_mtime = os.stat(self.photo_dir).st_mtime_ns
+            if dir_mtime == self._photo_dir_mtime:
+                return bool(self.photos)
             
-            # Sort photos by name
-            self.photos.sort()
+            # Single directory pass, matching extensions case-insensitively
+            exts = {'.' + ext.lower() for ext in self.allowed_extensions}
+            with os.scandir(self.photo_dir) as it:
+                # Sort photos by name
+                self.photos = sorted(
+                    e.path for e in it
+                    if e.is_file() and os.path.splitext(e.name)[1].lower() in exts
+                )
+            self._photo_dir_mtime = dir_mtime
+            # A file may have been replaced under the same name, so drop
+            # prefetched decodes too (cancelling any not yet started)
+            for future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+            self._converted.clear()
             
             logger.info(f"Loaded {len(self.photos)} photos")
             
@@ -135,53 +241,211 @@ class PhotoSlideshow:
             return True
             
         except Exception as e:
+            self.photos = []
             logger.error(f"Error loading photos: {e}")
             return False
     
-    def load_and_scale_image(self, image_path):
-        """Load an image and scale it to fit the display"""
+    def _load_with_pil(self, image_path):
+        """Decode an image via PIL (JPEGs, and formats pygame can't handle such as HEIC)"""
+        pil_image = Image.open(image_path)
+        # Let libjpeg decode at 1/2, 1/4 or 1/8 scale when that still covers the display
+        if pil_image.format == 'JPEG':
+            pil_image.draft('RGB', self._draft_size)
+        if pil_image.mode != 'RGB':
+            pil_image = pil_image.convert('RGB')
+        # frombuffer wraps the bytes (the Surface keeps them alive) instead of copying
+        return pygame.image.frombuffer(pil_image.tobytes(), pil_image.size, 'RGB')
+    
+    def _prerender_path(self, image_path):
+        """Path of the upload-time display copy for the current geometry"""
+        return os.path.join(os.path.dirname(image_path), '.display',
+                            f"{self.width}x{self.height}_r{self.rotation}",
+                            f"{os.path.basename(image_path)}.jpg")
+    
+    def _display_cache_path(self, image_path):
+        """Path of the display cache entry for an image at the current settings"""
+        mtime = os.path.getmtime(image_path)
+        key = hashlib.sha1(
+            f"{os.path.abspath(image_path)}|{mtime}|{self.width}x{self.height}|{self.rotation}|{self.fit_mode}".encode()
+        ).hexdigest()
+        return os.path.join(self.photo_dir, DISPLAY_CACHE_DIR, key + DISPLAY_CACHE_EXT)
+    
+    def _read_display_cache(self, cache_path):
+        """Map a cached entry straight into a Surface, or return None on a miss"""
+        buf = None
         try:
-            # Load image with PIL
-            pil_image = Image.open(image_path)
-            
-            # Convert to RGB if necessary
-            if pil_image.mode != 'RGB':
-                pil_image = pil_image.convert('RGB')
-            
-            # Apply rotation if configured
-            if self.rotation != 0:
-                pil_image = pil_image.rotate(-self.rotation, expand=True)
-            
-            # Calculate scaling to fit display while maintaining aspect ratio
-            img_ratio = pil_image.width / pil_image.height
-            display_ratio = self.width / self.height
-            
-            if img_ratio > display_ratio:
-                # Image is wider - scale by width
-                new_width = self.width
-                new_height = int(self.width / img_ratio)
-            else:
-                # Image is taller - scale by height
-                new_height = self.height
-                new_width = int(self.height * img_ratio)
+            with open(cache_path, 'rb') as f:
+                # ACCESS_COPY gives a writable view without copying the pages
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+            width, height, x, y = DISPLAY_CACHE_HEADER.unpack_from(buf)
+            valid = len(buf) - DISPLAY_CACHE_HEADER.size == width * height * 4
+        except OSError:
+            return None
+        except (ValueError, struct.error):
+            # Empty (mmap refuses it) or shorter than the header
+            valid = False
+        
+        if not valid:
+            # Drop the bad entry so it gets rebuilt
+            if buf is not None:
+                buf.close()
+            try:
+                os.remove(cache_path)
+            except OSError:
+                pass
+            return None
+        pixels = memoryview(buf)[DISPLAY_CACHE_HEADER.size:]
+        # The Surface keeps the mapping alive; pages fault in on first use
+        return pygame.image.frombuffer(pixels, (width, height), DISPLAY_CACHE_FORMAT), (x, y)
+    
+    def _write_display_cache(self, cache_path, surface, position):
+        """Store a prepared image in the display cache"""
+        cache_dir = os.path.dirname(cache_path)
+        tmp_path = None
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Unique temp name: a prefetch worker and the main thread may write
+            # the same entry at once
+            fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=cache_dir)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(DISPLAY_CACHE_HEADER.pack(*surface.get_size(), *position))
+                f.write(pygame.image.tostring(surface, DISPLAY_CACHE_FORMAT))
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write display cache {cache_path}: {e}")
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            return
+        
+        # One eviction at a time; if one is running, a later write trims again
+        if self._evict_lock.acquire(blocking=False):
+            threading.Thread(target=self._evict_display_cache, daemon=True).start()
+    
+    def _evict_display_cache(self):
+        """Drop the oldest display cache entries beyond the size limit"""
+        cache_dir = os.path.join(self.photo_dir, DISPLAY_CACHE_DIR)
+        try:
+            with os.scandir(cache_dir) as it:
+                entries = [(e.stat().st_mtime, e.path) for e in it if e.name.endswith(DISPLAY_CACHE_EXT)]
             
-            # Resize image
-            pil_image = pil_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            entries.sort()
+            for _, path in entries[:-DISPLAY_CACHE_MAX_ENTRIES]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        except OSError:
+            pass
+        finally:
+            self._evict_lock.release()
+    
+    def prepare_image(self, image_path):
+        """Decode, rotate and scale an image into an unconverted Surface.
+        
+        Returns (surface, position). Results are cached on disk keyed by the
+        photo's path, mtime and the display settings. Safe to call off the
+        main thread since it never touches the display surface.
+        """
+        # Upload-time copies are already sized, letterboxed and rotated
+        if self.use_prerendered:
+            try:
+                surface = pygame.image.load(self._prerender_path(image_path))
+                if surface.get_size() == (self.width, self.height):
+                    return surface, (0, 0)
+            except (pygame.error, FileNotFoundError):
+                pass
+        
+        cache_path = self._display_cache_path(image_path)
+        cached = self._read_display_cache(cache_path)
+        if cached is not None:
+            return cached
+        
+        # JPEGs go through PIL for shrink-on-decode; SDL_image handles the rest,
+        # with PIL as the fallback for formats it lacks
+        if image_path.lower().endswith(('.jpg', '.jpeg')):
+            surface = self._load_with_pil(image_path)
+        else:
+            try:
+                surface = pygame.image.load(image_path)
+            except pygame.error:
+                surface = self._load_with_pil(image_path)
+        
+        # smoothscale only works on 24/32-bit surfaces
+        if surface.get_bitsize() not in (24, 32):
+            surface = self._load_with_pil(image_path)
+        
+        # Rotate, scale and position for the display
+        surface, (x, y) = self._scale(surface)
+        
+        self._write_display_cache(cache_path, surface, (x, y))
+        return surface, (x, y)
+    
+    def load_and_scale_image(self, image_path):
+        """Load an image and scale it to fit the display.
+        
+        The display must be initialized first, since the result is
+        converted to the screen's pixel format.
+        """
+        # Already converted while it was in the prefetch window
+        converted = self._converted.get(image_path)
+        if converted is not None:
+            return converted
+        
+        try:
+            # Use the prefetched result if a worker already started on it
+            prepared = None
+            future = self._pending.get(image_path)
+            if future is not None:
+                try:
+                    prepared = future.result()
+                except Exception as e:
+                    logger.warning(f"Prefetch failed for {image_path}: {e}")
+            if prepared is None:
+                prepared = self.prepare_image(image_path)
             
-            # Convert to pygame surface
-            image_str = pil_image.tobytes()
-            image_surface = pygame.image.fromstring(image_str, pil_image.size, pil_image.mode)
+            surface, position = prepared
             
-            # Center the image on screen
-            x = (self.width - new_width) // 2
-            y = (self.height - new_height) // 2
+            # Match the screen's exact pixel format so the blit is a plain copy
+            # (must happen on the main thread)
+            image_surface = surface.convert(self.screen)
             
-            return image_surface, (x, y)
+            self._converted[image_path] = (image_surface, position)
+            return image_surface, position
             
         except Exception as e:
             logger.error(f"Error loading image {image_path}: {e}")
             return None, None
     
+    def start_prefetcher(self):
+        """Start the worker pool that prepares neighbouring photos"""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS,
+                                            thread_name_prefix='prefetch')
+    
+    def prefetch_neighbours(self):
+        """Keep decodes outstanding for the photos around the current one"""
+        if self._pool is None or not self.photos:
+            return
+        
+        offsets = PREFETCH_WIDE if self.slideshow_interval > PREFETCH_WIDE_MIN_INTERVAL else PREFETCH_NEAR
+        count = len(self.photos)
+        wanted = [self.photos[(self.current_photo_index + offset) % count] for offset in offsets]
+        
+        # Drop results that fell out of the window; cancel any not yet started
+        for path in list(self._pending):
+            if path not in wanted:
+                self._pending.pop(path).cancel()
+        for path in list(self._converted):
+            if path not in wanted:
+                del self._converted[path]
+        
+        for path in wanted:
+            if path not in self._pending:
+                self._pending[path] = self._pool.submit(self.prepare_image, path)
+    
     def display_photo(self, photo_path):
         """Display a photo on the screen"""
         try:
@@ -191,14 +455,29 @@ class PhotoSlideshow:
             if image_surface is None:
                 return False
             
-            # Clear screen with black background
-            self.screen.fill((0, 0, 0))
+            # Only the image area and the letterbox strips around it change
+            image_rect = pygame.Rect(position, image_surface.get_size()).clip(self.screen.get_rect())
+            dirty = [image_rect]
+            blit_sequence = []
+            
+            # Repaint the black bars only when the letterbox geometry changed
+            if image_rect != self._last_image_rect:
+                strips = self._letterbox_strips(image_rect)
+                blit_sequence.extend((self._black_surface(strip.size), strip.topleft) for strip in strips)
+                dirty.extend(strips)
+                self._last_image_rect = image_rect
             
-            # Display the image
-            self.screen.blit(image_surface, position)
+            # Display the image (plain dest-only blit of a format-matched surface)
+            blit_sequence.append((image_surface, position))
+            
+            # Compose bars and image in a single call into pygame
+            if hasattr(self.screen, 'fblits'):
+                self.screen.fblits(blit_sequence)
+            else:
+                self.screen.blits(blit_sequence, doreturn=False)
             
-            # Update display
-            pygame.display.flip()
+            # Update just the changed regions
+            pygame.display.update(dirty)
             
             logger.info(f"Displayed photo: {os.path.basename(photo_path)}")
             return True
@@ -207,6 +486,26 @@ class PhotoSlideshow:
             logger.error(f"Error displaying photo: {e}")
             return False
     
+    def _black_surface(self, size):
+        """Return a cached solid black surface of the given size"""
+        surface = self._black_surfaces.get(size)
+        if surface is None:
+            surface = pygame.Surface(size).convert(self.screen)
+            surface.fill((0, 0, 0))
+            self._black_surfaces[size] = surface
+        return surface
+    
+    def _letterbox_strips(self, image_rect):
+        """Return the screen rects not covered by image_rect"""
+        screen_rect = self.screen.get_rect()
+        strips = [
+            pygame.Rect(0, 0, screen_rect.width, image_rect.top),
+            pygame.Rect(0, image_rect.bottom, screen_rect.width, screen_rect.height - image_rect.bottom),
+            pygame.Rect(0, image_rect.top, image_rect.left, image_rect.height),
+            pygame.Rect(image_rect.right, image_rect.top, screen_rect.width - image_rect.right, image_rect.height),
+        ]
+        return [strip for strip in strips if strip.width > 0 and strip.height > 0]
+    
     def handle_swipe(self, start_pos, end_pos):
         """Handle swipe gesture"""
         dx = end_pos[0] - start_pos[0]
@@ -226,7 +525,8 @@ class PhotoSlideshow:
             
         self.current_photo_index = (self.current_photo_index + 1) % len(self.photos)
         self.display_photo(self.photos[self.current_photo_index])
-        self.last_photo_update = time.time()
+        self.restart_advance_timer()
+        self.prefetch_neighbours()
     
     def previous_photo(self):
         """Display previous photo"""
@@ -235,7 +535,38 @@ class PhotoSlideshow:
             
         self.current_photo_index = (self.current_photo_index - 1) % len(self.photos)
         self.display_photo(self.photos[self.current_photo_index])
-        self.last_photo_update = time.time()
+        self.restart_advance_timer()
+        self.prefetch_neighbours()
+    
+    def start_photo_watcher(self):
+        """Watch the photo directory with inotify; returns False if unavailable"""
+        if not INOTIFY_AVAILABLE:
+            logger.info(f"inotify_simple not installed, rescanning photos every {PHOTO_RELOAD_INTERVAL}s")
+            return False
+        
+        try:
+            inotify = INotify()
+            inotify.add_watch(self.photo_dir, inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO |
+                              inotify_flags.MOVED_FROM | inotify_flags.DELETE)
+        except OSError as e:
+            logger.warning(f"Could not watch {self.photo_dir}: {e}")
+            return False
+        
+        threading.Thread(target=self._photo_watcher, args=(inotify,),
+                         name='photo-watcher', daemon=True).start()
+        return True
+    
+    def _photo_watcher(self, inotify):
+        """Post a reload event whenever files in the photo directory change"""
+        while self.running:
+            # read_delay coalesces a burst of changes (e.g. multi-upload) into one reload
+            if inotify.read(timeout=1000, read_delay=250):
+                pygame.event.post(pygame.event.Event(RELOAD_EVENT))
+        inotify.close()
+    
+    def restart_advance_timer(self):
+        """(Re)arm the slideshow timer so the next advance is a full interval away"""
+        pygame.time.set_timer(ADVANCE_EVENT, int(self.slideshow_interval * 1000))
     
     def run(self):
         """Main slideshow loop"""
@@ -250,52 +581,54 @@ class PhotoSlideshow:
             return
         
         # Display first photo
+        self.start_prefetcher()
         if self.photos:
             self.display_photo(self.photos[self.current_photo_index])
-            self.last_photo_update = time.time()
+            self.prefetch_neighbours()
         
         self.running = True
         logger.info("Starting slideshow")
         
+        # Timers wake the loop only when there is work to do
+        self.restart_advance_timer()
+        if not self.start_photo_watcher():
+            pygame.time.set_timer(RELOAD_EVENT, PHOTO_RELOAD_INTERVAL * 1000)
+        
         try:
             while self.running:
-                # Handle events
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        self.running = False
-                    
-                    elif event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_ESCAPE:
-                            self.running = False
-                        elif event.key == pygame.K_RIGHT:
-                            self.next_photo()
-                        elif event.key == pygame.K_LEFT:
-                            self.previous_photo()
-                    
-                    elif self.enable_touch:
-                        if event.type == pygame.MOUSEBUTTONDOWN:
-                            self.swipe_start_pos = event.pos
-                            self.swipe_start_time = time.time()
-                        
-                        elif event.type == pygame.MOUSEBUTTONUP:
-                            if self.swipe_start_pos:
-                                self.handle_swipe(self.swipe_start_pos, event.pos)
-                                self.swipe_start_pos = None
+                # Sleep until an event arrives (the timeout just bounds the wait)
+                event = pygame.event.wait(1000)
                 
-                # Check if it's time to advance slideshow
-                current_time = time.time()
-                if current_time - self.last_photo_update >= self.slideshow_interval:
+                if event.type == pygame.QUIT:
+                    self.running = False
+                
+                elif event.type == ADVANCE_EVENT:
                     self.next_photo()
                 
-                # Reload photos periodically to pick up new uploads
-                if int(current_time) % 300 == 0:  # Every 5 minutes
+                elif event.type == RELOAD_EVENT:
+                    # Reload photos to pick up new uploads and deletions
                     old_count = len(self.photos)
                     self.load_photos()
                     if len(self.photos) != old_count:
                         logger.info(f"Photo count changed: {old_count} -> {len(self.photos)}")
                 
-                # Control frame rate
-                self.clock.tick(30)  # 30 FPS
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        self.running = False
+                    elif event.key == pygame.K_RIGHT:
+                        self.next_photo()
+                    elif event.key == pygame.K_LEFT:
+                        self.previous_photo()
+                
+                elif self.enable_touch:
+                    if event.type == pygame.MOUSEBUTTONDOWN:
+                        self.swipe_start_pos = event.pos
+                        self.swipe_start_time = time.monotonic()
+                    
+                    elif event.type == pygame.MOUSEBUTTONUP:
+                        if self.swipe_start_pos:
+                            self.handle_swipe(self.swipe_start_pos, event.pos)
+                            self.swipe_start_pos = None
                 
         except KeyboardInterrupt:
             logger.info("Slideshow interrupted by user")
@@ -307,6 +640,8 @@ class PhotoSlideshow:
     def cleanup(self):
         """Clean up resources"""
         logger.info("Cleaning up...")
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
         pygame.quit()
         self.running = False
 
@@ -10,7 +10,8 @@ import logging
 import threading
 import time
 import signal
-from multiprocessing import Process
+import subprocess
+import functools
 
 # Configure logging
 logging.basicConfig(
@@ -24,6 +25,9 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Pause before restarting a crashed service so a crash loop can't spin
+RESTART_DELAY = 2  # seconds
+
 # Global process references
 web_process = None
 display_process = None
@@ -61,52 +65,56 @@ def start_display_slideshow():
         except Exception as e2:
             logger.error(f"Error starting simple slideshow: {e2}")
 
+def spawn_service(service, *extra_args):
+    """Run one service in a fresh interpreter so it imports only its own stack"""
+    cmd = [sys.executable, os.path.abspath(__file__), '--service', service, *extra_args]
+    return subprocess.Popen(cmd)
+
+def is_running(process):
+    """Check whether a service process is still alive"""
+    return process is not None and process.poll() is None
+
 def stop_services():
     """Stop all running services"""
     global web_process, display_process
     
     logger.info("Stopping services...")
     
-    if web_process and web_process.is_alive():
-        logger.info("Terminating web server...")
-        web_process.terminate()
-        web_process.join(timeout=5)
-        if web_process.is_alive():
-            web_process.kill()
-    
-    if display_process and display_process.is_alive():
-        logger.info("Terminating display slideshow...")
-        display_process.terminate()
-        display_process.join(timeout=5)
-        if display_process.is_alive():
-            display_process.kill()
+    for name, process in (("web server", web_process), ("display slideshow", display_process)):
+        if is_running(process):
+            logger.info(f"Terminating {name}...")
+            process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
     
     logger.info("All services stopped")
 
-def check_environment():
-    """Check if running on Raspberry Pi with proper environment"""
-    is_raspberry_pi = False
-    
+@functools.lru_cache(maxsize=1)
+def is_raspberry_pi():
+    """Check the device-tree model once; the hardware doesn't change at runtime"""
     try:
         with open('/proc/device-tree/model', 'r') as f:
             model = f.read()
             if 'Raspberry Pi' in model:
-                is_raspberry_pi = True
                 logger.info(f"Running on: {model.strip()}")
+                return True
     except:
         pass
-    
-    if not is_raspberry_pi:
+    return False
+
+def check_environment():
+    """Check if running on Raspberry Pi with proper environment"""
+    if not is_raspberry_pi():
         logger.warning("Not running on Raspberry Pi - display features may not work properly")
     
-    # Check for required directories
-    required_dirs = ['photos', 'photos/thumbnails', 'static', 'templates']
-    for dir_path in required_dirs:
-        if not os.path.exists(dir_path):
-            os.makedirs(dir_path, exist_ok=True)
-            logger.info(f"Created directory: {dir_path}")
+    # Create required directories (no-op when they already exist)
+    for dir_path in ('photos/thumbnails', 'static', 'templates'):
+        os.makedirs(dir_path, exist_ok=True)
     
-    return is_raspberry_pi
+    return is_raspberry_pi()
 
 def main():
     """Main entry point"""
@@ -119,9 +127,18 @@ def main():
     parser.add_argument('--port', type=int, default=5000, help='Web server port (default: 5000)')
     parser.add_argument('--debug', action='store_true', help='Enable debug mode')
     parser.add_argument('--no-display', action='store_true', help='Disable display output (for development)')
+    parser.add_argument('--service', choices=['web', 'display'], help=argparse.SUPPRESS)
     
     args = parser.parse_args()
     
+    # Child process mode: run a single service and exit
+    if args.service == 'web':
+        start_web_server(args.port, args.debug)
+        return
+    if args.service == 'display':
+        start_display_slideshow()
+        return
+    
     # Set up signal handlers
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
@@ -144,8 +161,8 @@ def main():
     try:
         # Start web server process
         if run_web:
-            web_process = Process(target=start_web_server, args=(args.port, args.debug))
-            web_process.start()
+            web_args = ['--port', str(args.port)] + (['--debug'] if args.debug else [])
+            web_process = spawn_service('web', *web_args)
             logger.info("Web server process started")
             
             # Give web server time to start
@@ -153,27 +170,34 @@ def main():
         
         # Start display slideshow process
         if run_display:
-            display_process = Process(target=start_display_slideshow)
-            display_process.start()
+            display_process = spawn_service('display')
             logger.info("Display slideshow process started")
         
+        # Any signal (notably SIGCHLD when a service exits) writes a byte to
+        # this pipe, so the supervisor sleeps until there is something to check
+        wakeup_r, wakeup_w = os.pipe()
+        os.set_blocking(wakeup_w, False)
+        signal.set_wakeup_fd(wakeup_w)
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+        
         # Monitor processes
         while running:
             # Check if processes are still alive
-            if web_process and not web_process.is_alive():
+            if web_process and not is_running(web_process):
                 logger.error("Web server process died unexpectedly")
                 if run_display:
                     stop_services()
                     sys.exit(1)
             
-            if display_process and not display_process.is_alive():
+            if display_process and not is_running(display_process):
                 logger.error("Display slideshow process died unexpectedly")
                 # Restart display process
                 logger.info("Attempting to restart display slideshow...")
-                display_process = Process(target=start_display_slideshow)
-                display_process.start()
+                time.sleep(RESTART_DELAY)
+                display_process = spawn_service('display')
             
-            time.sleep(5)
+            # Block until the next signal
+            os.read(wakeup_r, 512)
     
     except Exception as e:
         logger.error(f"Fatal error: {e}")
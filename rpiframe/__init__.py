@@ -8,7 +8,16 @@ __author__ = "RPIFrame Project"
 
 from .core import PhotoFrame
 from .config import Config
-from .display import DisplayManager
-from .web import WebServer
 
-__all__ = ['PhotoFrame', 'Config', 'DisplayManager', 'WebServer']
\ No newline at end of file
+__all__ = ['PhotoFrame', 'Config', 'DisplayManager', 'WebServer']
+
+def __getattr__(name):
+    # DisplayManager pulls in pygame and WebServer pulls in Flask; load them
+    # on first use so processes that need neither stay small
+    if name == 'DisplayManager':
+        from .display import DisplayManager
+        return DisplayManager
+    if name == 'WebServer':
+        from .web import WebServer
+        return WebServer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
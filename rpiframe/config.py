@@ -6,6 +6,8 @@ Handles loading, saving, and validation of configuration settings.
 import json
 import os
 import logging
+import threading
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, Any, Optional
 
@@ -19,7 +21,8 @@ DEFAULT_CONFIG = {
         "slideshow_interval": 60,
         "transition_effect": "fade",
         "brightness": 100,
-        "fit_mode": "contain"
+        "fit_mode": "contain",
+        "resample": "LANCZOS"
     },
     "photos": {
         "directory": "photos",
@@ -42,12 +45,47 @@ DEFAULT_CONFIG = {
     }
 }
 
+@dataclass
+class DisplayConfig:
+    """Typed snapshot of the display section for hot-path reads"""
+    width: int
+    height: int
+    rotation: int
+    slideshow_interval: int
+    fit_mode: str
+    brightness: int
+    resample: str = "LANCZOS"
+    rotation_interval_minutes: Optional[float] = None
+    
+    @classmethod
+    def from_dict(cls, display: Dict[str, Any]) -> 'DisplayConfig':
+        """Build from a display config section, filling gaps from the defaults"""
+        defaults = DEFAULT_CONFIG["display"]
+        return cls(
+            width=display.get("width", defaults["width"]),
+            height=display.get("height", defaults["height"]),
+            rotation=display.get("rotation", defaults["rotation"]),
+            slideshow_interval=display.get("slideshow_interval", defaults["slideshow_interval"]),
+            fit_mode=display.get("fit_mode", defaults["fit_mode"]),
+            brightness=display.get("brightness", defaults["brightness"]),
+            resample=display.get("resample", defaults["resample"]),
+            rotation_interval_minutes=display.get("rotation_interval_minutes"),
+        )
+
 class Config:
     """Configuration manager for RPIFrame"""
     
+    # Seconds to wait after a change before writing, so a burst of
+    # settings updates results in a single write to the SD card
+    FLUSH_DELAY = 2.0
+    
     def __init__(self, config_file: str = "config.json"):
         self.config_file = Path(config_file)
         self._config = self._load_config()
+        self.display_cfg = DisplayConfig.from_dict(self.display)
+        self._dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
+        self._flush_lock = threading.Lock()
         
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from file or create default"""
@@ -81,12 +119,36 @@ class Config:
     def _save_config(self, config: Dict[str, Any]) -> None:
         """Save configuration to file"""
         try:
-            with open(self.config_file, 'w') as f:
+            # Write to a temp file and swap it in so readers never see a partial file
+            tmp_file = self.config_file.with_name(self.config_file.name + ".tmp")
+            with open(tmp_file, 'w') as f:
                 json.dump(config, f, indent=2)
+            os.replace(tmp_file, self.config_file)
             logger.info(f"Configuration saved to {self.config_file}")
         except Exception as e:
             logger.error(f"Error saving config: {e}")
     
+    def _schedule_flush(self) -> None:
+        """Mark the config dirty and (re)arm the delayed write"""
+        with self._flush_lock:
+            self._dirty = True
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+            self._flush_timer = threading.Timer(self.FLUSH_DELAY, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+    
+    def flush(self) -> None:
+        """Write pending changes to disk immediately"""
+        with self._flush_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+        self._save_config(self._config)
+    
     def get(self, section: str, key: Optional[str] = None, default: Any = None) -> Any:
         """Get configuration value"""
         try:
@@ -108,7 +170,8 @@ class Config:
                     self._config[section] = {}
                 self._config[section][key] = value
             
-            self._save_config(self._config)
+            self.display_cfg = DisplayConfig.from_dict(self.display)
+            self._schedule_flush()
         except Exception as e:
             logger.error(f"Error setting config: {e}")
     
@@ -121,7 +184,8 @@ class Config:
                 else:
                     self._config[section] = values
             
-            self._save_config(self._config)
+            self.display_cfg = DisplayConfig.from_dict(self.display)
+            self._schedule_flush()
         except Exception as e:
             logger.error(f"Error updating config: {e}")
     
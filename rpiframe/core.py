@@ -11,31 +11,124 @@ import threading
 import time
 import socket
 from pathlib import Path
-from multiprocessing import Process, Queue
-from typing import Optional
+import multiprocessing
+from multiprocessing import Process
+from multiprocessing.connection import Connection, wait
+from typing import Optional, Tuple
 
 from .config import Config
-from .display import DisplayManager
-from .web import WebServer
 from .utils import setup_logging, create_directories
 
 logger = logging.getLogger(__name__)
 
+def _report_startup(conn: Connection, message: str) -> None:
+    """Send the startup message; the parent may no longer be listening"""
+    try:
+        conn.send(message)
+    except OSError:
+        pass
+    finally:
+        conn.close()
+
+def _init_child(config_path: str) -> Config:
+    """Common setup for a child process; returns its own Config"""
+    # Don't run the parent's shutdown handler in the child; SIGTERM just
+    # unwinds it, so cleanup and the final log flush still happen
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    config = Config(config_path)
+    setup_logging(config)
+    return config
+
+def _run_web_server(config_path: str, conn: Connection) -> None:
+    """Child process entry point for the web server"""
+    config = None
+    try:
+        from .web import WebServer
+        config = _init_child(config_path)
+        web_server = WebServer(config)
+        _report_startup(conn, "WEB_STARTED")
+        web_server.run()
+    except Exception as e:
+        logger.error(f"Web server error: {e}")
+        if not conn.closed:
+            _report_startup(conn, f"WEB_ERROR:{e}")
+    finally:
+        # Settings changed through the web interface are written after a
+        # short delay; don't lose them when the server stops first
+        if config is not None:
+            config.flush()
+        # multiprocessing exits children with os._exit, skipping atexit,
+        # so write out any buffered log records here
+        logging.shutdown()
+
+def _run_display_manager(config_path: str, conn: Connection) -> None:
+    """Child process entry point for the display manager"""
+    try:
+        from .display import DisplayManager
+        display_manager = DisplayManager(_init_child(config_path))
+        _report_startup(conn, "DISPLAY_STARTED")
+        display_manager.run()
+    except Exception as e:
+        logger.error(f"Display manager error: {e}")
+        if not conn.closed:
+            _report_startup(conn, f"DISPLAY_ERROR:{e}")
+    finally:
+        # multiprocessing exits children with os._exit, skipping atexit,
+        # so write out any buffered log records here
+        logging.shutdown()
+
 class PhotoFrame:
     """Main PhotoFrame application orchestrator"""
     
+    # Seconds children get to exit after SIGTERM before being killed
+    STOP_TIMEOUT = 2.0
+    
+    # Display restart backoff: the delay doubles (up to the maximum) each time
+    # the display dies within DISPLAY_STABLE_TIME of starting
+    RESTART_DELAY = 2.0
+    MAX_RESTART_DELAY = 60.0
+    DISPLAY_STABLE_TIME = 60.0
+    
     def __init__(self, config_file: str = "config.json"):
         """Initialize PhotoFrame application"""
         self.config = Config(config_file)
         self.display_process: Optional[Process] = None
         self.web_process: Optional[Process] = None
+        # Startup pipe of a restarted display, read once it exits
+        self._display_conn: Optional[Connection] = None
+        self._display_started = 0.0
+        # Set when the display reported an error during startup; it isn't restarted
+        self._display_failed = False
+        
+        # Children (including display restarts) are forked from a small
+        # forkserver process rather than from this one, so they don't copy
+        # whatever this process has accumulated; the web and display stacks
+        # are imported only inside the child that needs them
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            self._mp = multiprocessing.get_context("forkserver")
+        else:
+            self._mp = multiprocessing.get_context()
         self.running = False
         self.web_only = False
         self.display_only = False
         
+        # Last known child state, kept by start/stop and the monitor so
+        # get_status doesn't need to poll the processes
+        self._alive = {"web": False, "display": False}
+        self._alive_lock = threading.Lock()
+        
+        # Guards against stop() running twice, e.g. a signal arriving while
+        # start() is already stopping. Reentrant because the signal handler
+        # runs on the same thread that may be inside stop().
+        self._stop_lock = threading.RLock()
+        self._stopping = False
+        
         # Setup logging
         setup_logging(self.config)
         
+        self._is_pi = self._detect_raspberry_pi()
+        
         # Validate configuration
         if not self.config.validate():
             logger.error("Configuration validation failed")
@@ -47,6 +140,13 @@ class PhotoFrame:
         # Check for existing processes
         self._check_existing_processes()
         
+        # Signals also write a byte to this pipe, which the monitor waits on
+        # alongside the children so it wakes immediately
+        self._wakeup_r, wakeup_w = os.pipe()
+        os.set_blocking(self._wakeup_r, False)
+        os.set_blocking(wakeup_w, False)
+        signal.set_wakeup_fd(wakeup_w)
+        
         # Setup signal handlers
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
@@ -103,34 +203,46 @@ class PhotoFrame:
     def _signal_handler(self, signum: int, frame) -> None:
         """Handle shutdown signals gracefully"""
         logger.info(f"Received signal {signum}, shutting down...")
-        self.stop()
-        sys.exit(0)
+        self.running = False
+        if not self.stop():
+            # A stop() already under way (this signal interrupted it) still has
+            # children to terminate and join; let it finish instead of exiting
+            return
+        # Children are gone (the web server saved any pending settings);
+        # skip interpreter teardown
+        logging.shutdown()
+        os._exit(0)
     
-    def _start_web_server(self, queue: Queue) -> None:
-        """Start web server in separate process"""
-        try:
-            web_server = WebServer(self.config)
-            queue.put("WEB_STARTED")
-            web_server.run()
-        except Exception as e:
-            logger.error(f"Web server error: {e}")
-            queue.put(f"WEB_ERROR:{e}")
+    def _spawn(self, target, name: str) -> Tuple[Process, Connection]:
+        """Start a child process; returns it with the read end of its startup pipe"""
+        # A one-way pipe is enough for the single startup message; unlike a
+        # Queue it needs no feeder thread or extra locks
+        parent_conn, child_conn = self._mp.Pipe(duplex=False)
+        # Only the config path is handed over, never this object
+        process = self._mp.Process(target=target, args=(str(self.config.config_file), child_conn), name=name)
+        process.start()
+        # Only the child writes; closing our copy lets recv() see EOF if it dies
+        child_conn.close()
+        return process, parent_conn
     
-    def _start_display_manager(self, queue: Queue) -> None:
-        """Start display manager in separate process"""
+    @staticmethod
+    def _read_startup(conn: Connection) -> str:
+        """Read a ready child's startup message"""
         try:
-            display_manager = DisplayManager(self.config)
-            queue.put("DISPLAY_STARTED")
-            display_manager.run()
-        except Exception as e:
-            logger.error(f"Display manager error: {e}")
-            queue.put(f"DISPLAY_ERROR:{e}")
+            return conn.recv()
+        except EOFError:
+            raise RuntimeError("process exited during startup")
+        finally:
+            conn.close()
     
     def start(self, web_only: bool = False, display_only: bool = False) -> None:
         """Start the PhotoFrame application"""
         self.web_only = web_only
         self.display_only = display_only
         self.running = True
+        self._display_failed = False
+        with self._stop_lock:
+            self._stopping = False
         
         logger.info("Starting PhotoFrame application")
         logger.info(f"Mode: Web Only={web_only}, Display Only={display_only}")
@@ -145,48 +257,54 @@ class PhotoFrame:
                 self.display_only = False
         
         try:
-            # Start web server
+            # Start both children before waiting, so their startups overlap
+            pending = {}
             if not display_only:
-                web_queue = Queue()
-                self.web_process = Process(
-                    target=self._start_web_server,
-                    args=(web_queue,),
-                    name="WebServer"
-                )
-                self.web_process.start()
-                
-                # Wait for web server to start
-                try:
-                    result = web_queue.get(timeout=10)
-                    if result.startswith("WEB_ERROR"):
-                        raise Exception(result.split(":", 1)[1])
-                    logger.info("Web server started successfully")
-                except Exception as e:
-                    logger.error(f"Failed to start web server: {e}")
-                    self.stop()
-                    return
+                self.web_process, web_conn = self._spawn(_run_web_server, "WebServer")
+                self._set_alive("web", True)
+                pending[web_conn] = "web"
             
-            # Start display manager
             if not web_only and is_pi:
-                display_queue = Queue()
-                self.display_process = Process(
-                    target=self._start_display_manager,
-                    args=(display_queue,),
-                    name="DisplayManager"
-                )
-                self.display_process.start()
-                
-                # Wait for display manager to start
-                try:
-                    result = display_queue.get(timeout=10)
-                    if result.startswith("DISPLAY_ERROR"):
+                self.display_process, display_conn = self._spawn(_run_display_manager, "DisplayManager")
+                self._display_started = time.monotonic()
+                self._set_alive("display", True)
+                pending[display_conn] = "display"
+            
+            # Wait for both handshakes against one shared deadline
+            deadline = time.monotonic() + 10
+            while pending:
+                ready = wait(list(pending), timeout=max(0, deadline - time.monotonic()))
+                if not ready:
+                    break
+                for conn in ready:
+                    role = pending.pop(conn)
+                    try:
+                        result = self._read_startup(conn)
+                    except Exception as e:
+                        result = f"{role.upper()}_ERROR:{e}"
+                    
+                    if role == "web":
+                        if result.startswith("WEB_ERROR"):
+                            logger.error(f"Failed to start web server: {result.split(':', 1)[1]}")
+                            self.stop()
+                            return
+                        logger.info("Web server started successfully")
+                    elif result.startswith("DISPLAY_ERROR"):
+                        self._display_failed = True
                         logger.warning(f"Display manager error: {result.split(':', 1)[1]}")
                         logger.warning("Continuing with web-only mode")
                     else:
                         logger.info("Display manager started successfully")
-                except Exception as e:
-                    logger.warning(f"Display manager startup timeout: {e}")
-                    logger.warning("Continuing with web-only mode")
+            
+            # Whatever is still pending missed the deadline
+            for conn, role in pending.items():
+                conn.close()
+                if role == "web":
+                    logger.error("Failed to start web server: no response within 10s")
+                    self.stop()
+                    return
+                logger.warning("Display manager startup timeout")
+                logger.warning("Continuing with web-only mode")
             
             # Monitor processes
             self._monitor_processes()
@@ -196,60 +314,94 @@ class PhotoFrame:
             self.stop()
             raise
     
-    def stop(self) -> None:
-        """Stop all processes gracefully"""
+    def stop(self) -> bool:
+        """Stop all processes gracefully; False if a stop was already in progress"""
+        with self._stop_lock:
+            if self._stopping:
+                return False
+            self._stopping = True
+        
         logger.info("Stopping PhotoFrame application")
         self.running = False
         
-        # Stop web server
-        if self.web_process and self.web_process.is_alive():
-            logger.info("Stopping web server...")
-            self.web_process.terminate()
-            self.web_process.join(timeout=5)
-            if self.web_process.is_alive():
-                logger.warning("Force killing web server")
-                self.web_process.kill()
-                self.web_process.join()
+        children = [
+            (name, process)
+            for name, process in (("web server", self.web_process), ("display manager", self.display_process))
+            if process and process.is_alive()
+        ]
         
-        # Stop display manager
-        if self.display_process and self.display_process.is_alive():
-            logger.info("Stopping display manager...")
-            self.display_process.terminate()
-            self.display_process.join(timeout=5)
-            if self.display_process.is_alive():
-                logger.warning("Force killing display manager")
-                self.display_process.kill()
-                self.display_process.join()
+        # Signal every child first so they shut down in parallel
+        for name, process in children:
+            logger.info(f"Stopping {name}...")
+            process.terminate()
         
+        # One shared grace period for all of them, then force the stragglers
+        deadline = time.monotonic() + self.STOP_TIMEOUT
+        for name, process in children:
+            process.join(timeout=max(0, deadline - time.monotonic()))
+        for name, process in children:
+            if process.is_alive():
+                logger.warning(f"Force killing {name}")
+                process.kill()
+                process.join()
+        
+        self._set_alive("web", False)
+        self._set_alive("display", False)
         logger.info("PhotoFrame stopped")
+        return True
     
     def _monitor_processes(self) -> None:
         """Monitor running processes and restart if needed"""
         logger.info("Starting process monitoring")
+        restart_delay = self.RESTART_DELAY
         
         while self.running:
             try:
-                # Check web server
-                if not self.display_only and self.web_process:
-                    if not self.web_process.is_alive():
+                sentinels = {
+                    p.sentinel: name
+                    for name, p in (("web", self.web_process), ("display", self.display_process))
+                    if p
+                }
+                
+                # A child's sentinel becomes ready the moment it exits and the
+                # wakeup pipe when a signal arrives, so this blocks without
+                # polling and wakes only when there is work
+                for sentinel in wait([*sentinels, self._wakeup_r]):
+                    if sentinel == self._wakeup_r:
+                        self._drain_wakeup()
+                        continue
+                    self._set_alive(sentinels[sentinel], False)
+                    if sentinels[sentinel] == "web":
                         logger.error("Web server process died")
                         self.stop()
-                        break
-                
-                # Check display manager
-                if not self.web_only and self.display_process:
-                    if not self.display_process.is_alive():
-                        logger.warning("Display manager process died, attempting restart...")
-                        # Restart display process
-                        display_queue = Queue()
-                        self.display_process = Process(
-                            target=self._start_display_manager,
-                            args=(display_queue,),
-                            name="DisplayManager"
-                        )
-                        self.display_process.start()
-                
-                time.sleep(5)
+                        return
+                    
+                    if self._display_conn is not None:
+                        if self._display_startup_failed(self._display_conn):
+                            self._display_failed = True
+                        self._display_conn = None
+                    if self._display_failed:
+                        # Missing panel, pygame or similar; restarting won't help
+                        logger.warning("Display manager failed at startup, not restarting it")
+                        self.display_process = None
+                        continue
+                    
+                    # Back off while the display keeps dying soon after starting
+                    if time.monotonic() - self._display_started < self.DISPLAY_STABLE_TIME:
+                        delay = restart_delay
+                        restart_delay = min(restart_delay * 2, self.MAX_RESTART_DELAY)
+                    else:
+                        delay = restart_delay = self.RESTART_DELAY
+                    logger.warning(f"Display manager process died, restarting in {delay:.0f}s...")
+                    self.display_process = None
+                    if not self._wait_for_shutdown(delay):
+                        return
+                    
+                    # Restart display process
+                    self.display_process, self._display_conn = self._spawn(
+                        _run_display_manager, "DisplayManager")
+                    self._display_started = time.monotonic()
+                    self._set_alive("display", True)
                 
             except KeyboardInterrupt:
                 logger.info("Monitoring interrupted")
@@ -258,8 +410,41 @@ class PhotoFrame:
                 logger.error(f"Error in process monitoring: {e}")
                 time.sleep(5)
     
+    def _wait_for_shutdown(self, timeout: float) -> bool:
+        """Sleep up to timeout, waking early for signals; False once stopping"""
+        deadline = time.monotonic() + timeout
+        while self.running:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            if wait([self._wakeup_r], timeout=remaining):
+                self._drain_wakeup()
+        return False
+    
+    @staticmethod
+    def _display_startup_failed(conn: Connection) -> bool:
+        """Whether an exited display child reported a startup error"""
+        try:
+            return conn.poll() and conn.recv().startswith("DISPLAY_ERROR")
+        except (EOFError, OSError):
+            return False
+        finally:
+            conn.close()
+    
     def _is_raspberry_pi(self) -> bool:
         """Check if running on Raspberry Pi"""
+        return self._is_pi
+    
+    def _drain_wakeup(self) -> None:
+        """Empty the signal wakeup pipe"""
+        try:
+            while os.read(self._wakeup_r, 512):
+                pass
+        except BlockingIOError:
+            pass
+    
+    def _detect_raspberry_pi(self) -> bool:
+        """Read the device-tree model; done once since it can't change at runtime"""
         try:
             with open('/proc/device-tree/model', 'r') as f:
                 model = f.read()
@@ -274,21 +459,30 @@ class PhotoFrame:
         logger.info("Not running on Raspberry Pi")
         return False
     
+    def _set_alive(self, role: str, alive: bool) -> None:
+        """Record whether the "web" or "display" child is running"""
+        with self._alive_lock:
+            self._alive[role] = alive
+    
     def get_status(self) -> dict:
         """Get current application status"""
+        with self._alive_lock:
+            web_alive = self._alive["web"]
+            display_alive = self._alive["display"]
+        
         return {
             "running": self.running,
             "web_server": {
                 "enabled": not self.display_only,
-                "running": self.web_process.is_alive() if self.web_process else False,
+                "running": web_alive,
                 "port": self.config.web.get("port", 5000)
             },
             "display_manager": {
                 "enabled": not self.web_only,
-                "running": self.display_process.is_alive() if self.display_process else False
+                "running": display_alive
             },
             "config": {
                 "photos_directory": self.config.photos.get("directory", "photos"),
-                "slideshow_interval": self.config.display.get("slideshow_interval", 60)
+                "slideshow_interval": self.config.display_cfg.slideshow_interval
             }
         }
\ No newline at end of file
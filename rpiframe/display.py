@@ -5,10 +5,17 @@ Handles photo slideshow, touch input, and display control.
 
 import os
 import sys
-import glob
 import time
 import logging
 import random
+import functools
+import struct
+import hashlib
+import socket
+import queue
+import tempfile
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import List, Tuple, Optional, TYPE_CHECKING
 
@@ -22,11 +29,71 @@ except ImportError as e:
     Image = None
     logging.getLogger(__name__).warning(f"Display dependencies not available: {e}")
 
+# inotify lets us rescan only when the photo directory actually changes
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+    INOTIFY_AVAILABLE = True
+except ImportError:
+    INOTIFY_AVAILABLE = False
+
 if TYPE_CHECKING:
     from .config import Config
 
+from .utils import DISPLAY_CONTROL_SOCKET
+
 logger = logging.getLogger(__name__)
 
+if DISPLAY_AVAILABLE:
+    # Timer and wake-up events that drive the slideshow instead of polling
+    PHOTO_ADVANCE_EVENT = pygame.USEREVENT + 1
+    PHOTO_RELOAD_EVENT = pygame.USEREVENT + 2
+    CONTROL_EVENT = pygame.USEREVENT + 3
+PHOTO_RELOAD_INTERVAL = 300  # seconds
+
+# Prepared surfaces kept for quick redisplay (current, next and a few recent)
+SURFACE_CACHE_SIZE = 4
+
+# On-disk cache of display-ready pixels, so each photo is decoded and
+# resized once rather than on every pass through the slideshow
+DISK_CACHE_DIR = ".rpiframe_cache"
+DISK_CACHE_MAX_BYTES = 500 * 1024 * 1024
+# Header: width, height, x, y, bytes per pixel
+DISK_CACHE_HEADER = struct.Struct('<HHhhB')
+
+@functools.lru_cache(maxsize=None)
+def _combined_transpose(orientation: int, rotation: int):
+    """Single Image.Transpose equal to fixing EXIF orientation, then rotating
+    clockwise by rotation (a multiple of 90); None when nothing needs doing"""
+    transpose = Image.Transpose
+    # Each transpose as a 2x2 matrix (a, b, c, d) acting on centered (x, y), y down
+    matrices = {
+        None: (1, 0, 0, 1),
+        transpose.FLIP_LEFT_RIGHT: (-1, 0, 0, 1),
+        transpose.FLIP_TOP_BOTTOM: (1, 0, 0, -1),
+        transpose.ROTATE_90: (0, 1, -1, 0),
+        transpose.ROTATE_180: (-1, 0, 0, -1),
+        transpose.ROTATE_270: (0, -1, 1, 0),
+        transpose.TRANSPOSE: (0, 1, 1, 0),
+        transpose.TRANSVERSE: (0, -1, -1, 0),
+    }
+    # Same mapping as ImageOps.exif_transpose
+    exif_ops = {
+        2: transpose.FLIP_LEFT_RIGHT,
+        3: transpose.ROTATE_180,
+        4: transpose.FLIP_TOP_BOTTOM,
+        5: transpose.TRANSPOSE,
+        6: transpose.ROTATE_270,
+        7: transpose.TRANSVERSE,
+        8: transpose.ROTATE_90,
+    }
+    # Clockwise display rotation; ROTATE_* are counter-clockwise
+    rotation_ops = {90: transpose.ROTATE_270, 180: transpose.ROTATE_180, 270: transpose.ROTATE_90}
+    
+    a, b, c, d = matrices[exif_ops.get(orientation)]
+    e, f, g, h = matrices[rotation_ops.get(rotation)]
+    product = (e * a + f * c, e * b + f * d, g * a + h * c, g * b + h * d)
+    return next(op for op, matrix in matrices.items() if matrix == product)
+
 class DisplayManager:
     """Manages photo slideshow on DSI display with touch controls"""
     
@@ -39,32 +106,66 @@ class DisplayManager:
         self.running = False
         self.current_photo_index = 0
         self.photos: List[str] = []
-        self.last_photo_update = 0
+        self.last_photo_update = 0.0
         self.screen = None
         self.clock = None
+        # Screen area covered by the last photo, to skip redundant clears
+        self._last_image_rect = None
+        # Screen area covered by the last message, if one is showing
+        self._last_message_rect = None
+        # Cache key of the photo currently on screen, to skip redrawing it
+        self._displayed_key = None
+        # Rendered message lines by (message, color)
+        self._message_cache = {}
+        self._font = None
         
         # Display settings
-        self.width = self.config.display.get("width", 800)
-        self.height = self.config.display.get("height", 480)
-        self.rotation = self.config.display.get("rotation", 0)
+        display_cfg = self.config.display_cfg
+        self.width = display_cfg.width
+        self.height = display_cfg.height
+        self.rotation = display_cfg.rotation
         # Get interval from web settings (in minutes) or fallback to legacy (in seconds)
-        rotation_interval_minutes = self.config.display.get("rotation_interval_minutes")
-        if rotation_interval_minutes:
-            self.slideshow_interval = rotation_interval_minutes * 60  # Convert to seconds
+        if display_cfg.rotation_interval_minutes:
+            self.slideshow_interval = display_cfg.rotation_interval_minutes * 60  # Convert to seconds
         else:
-            self.slideshow_interval = self.config.display.get("slideshow_interval", 60)
-        self.fit_mode = self.config.display.get("fit_mode", "contain")
+            self.slideshow_interval = display_cfg.slideshow_interval
+        self.fit_mode = display_cfg.fit_mode
+        # LANCZOS by default; BILINEAR is roughly twice as fast with little visible loss
+        self.resample = getattr(Image.Resampling, display_cfg.resample.upper(), Image.Resampling.LANCZOS)
         self.enable_touch = self.config.system.get("enable_touch", True)
         
         # Photo settings
         self.photo_dir = Path(self.config.photos.get("directory", "photos"))
         self.allowed_extensions = self.config.photos.get("allowed_extensions", ["jpg", "jpeg", "png"])
+        # Lowercased suffixes, so .JPG, .Jpg and .jpg all match
+        self._photo_exts = frozenset('.' + ext.lower() for ext in self.allowed_extensions)
+        # Photo directory mtime at the last scan, to skip unchanged rescans
+        self._photo_dir_mtime: Optional[int] = None
         
         # Touch gesture settings
         self.swipe_threshold = 50  # pixels
+        self.swipe_max_duration = 0.5  # seconds; slower presses are ignored
         self.swipe_start_pos = None
         self.swipe_start_time = None
         
+        # Prepared (surface, position) by (path, mtime, geometry)
+        self._surface_cache: OrderedDict = OrderedDict()
+        self._surface_lock = threading.Lock()
+        self.cache_dir = self.photo_dir / DISK_CACHE_DIR
+        
+        # Background worker preparing the next photo; results pass through
+        # a single-slot queue
+        self._prep_cond = threading.Condition()
+        self._prep_target: Optional[str] = None
+        self._prep_pending: Optional[str] = None
+        self._prep_queue: queue.Queue = queue.Queue(maxsize=1)
+        self._prep_thread: Optional[threading.Thread] = None
+        
+        # Set by the control socket listener when the web interface asks to advance
+        self.next_event = threading.Event()
+        self.current_photo_name: Optional[str] = None
+        self._control_socket = None
+        
         logger.info(f"DisplayManager initialized: {self.width}x{self.height}")
     
     def initialize_display(self) -> bool:
@@ -137,6 +238,13 @@ class DisplayManager:
             # Hide mouse cursor
             pygame.mouse.set_visible(False)
             
+            # Drop every event the loop ignores (notably the stream of touch
+            # MOUSEMOTION events) inside SDL, so they never wake event.wait()
+            pygame.event.set_blocked(None)
+            pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN,
+                                      pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP,
+                                      PHOTO_ADVANCE_EVENT, PHOTO_RELOAD_EVENT, CONTROL_EVENT])
+            
             # Initialize clock
             self.clock = pygame.time.Clock()
             
@@ -154,23 +262,28 @@ class DisplayManager:
     def load_photos(self) -> bool:
         """Load photo list from directory"""
         try:
-            self.photos.clear()
-            
-            if not self.photo_dir.exists():
+            try:
+                dir_mtime = os.stat(self.photo_dir).st_mtime_ns
+            except FileNotFoundError:
+                self.photos = []
+                self._photo_dir_mtime = None
                 logger.warning(f"Photo directory does not exist: {self.photo_dir}")
                 return False
             
-            # Find all image files
-            for ext in self.allowed_extensions:
-                pattern = str(self.photo_dir / f"*.{ext}")
-                self.photos.extend(glob.glob(pattern))
-                
-                # Also check uppercase extensions
-                pattern = str(self.photo_dir / f"*.{ext.upper()}")
-                self.photos.extend(glob.glob(pattern))
-            
-            # Remove duplicates and sort
-            self.photos = sorted(list(set(self.photos)))
+            # Nothing was added, removed or renamed since the last scan
+            if dir_mtime == self._photo_dir_mtime:
+                return bool(self.photos)
+            
+            # Find all image files in a single directory pass, matching
+            # extensions case-insensitively
+            exts = self._photo_exts
+            with os.scandir(self.photo_dir) as it:
+                self.photos = sorted(
+                    entry.path for entry in it
+                    if entry.is_file(follow_symlinks=False)
+                    and os.path.splitext(entry.name)[1].lower() in exts
+                )
+            self._photo_dir_mtime = dir_mtime
             
             logger.info(f"Loaded {len(self.photos)} photos")
             
@@ -181,92 +294,225 @@ class DisplayManager:
             return True
             
         except Exception as e:
+            self.photos = []
             logger.error(f"Error loading photos: {e}")
             return False
     
+    def start_photo_watcher(self) -> bool:
+        """Watch the photo directory with inotify; returns False if unavailable"""
+        if not INOTIFY_AVAILABLE:
+            logger.info(f"inotify_simple not installed, checking photos every {PHOTO_RELOAD_INTERVAL}s")
+            return False
+        
+        try:
+            inotify = INotify()
+            inotify.add_watch(str(self.photo_dir), inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO |
+                              inotify_flags.MOVED_FROM | inotify_flags.DELETE)
+        except OSError as e:
+            logger.warning(f"Could not watch {self.photo_dir}: {e}")
+            return False
+        
+        threading.Thread(target=self._photo_watcher, args=(inotify,),
+                         name="photo-watcher", daemon=True).start()
+        return True
+    
+    def _photo_watcher(self, inotify) -> None:
+        """Post a reload event whenever files in the photo directory change"""
+        while self.running:
+            # read_delay coalesces a burst of changes (e.g. multi-upload) into one reload
+            if inotify.read(timeout=1000, read_delay=250):
+                pygame.event.post(pygame.event.Event(PHOTO_RELOAD_EVENT))
+        inotify.close()
+    
+    def _disk_cache_path(self, image_path: str) -> Path:
+        """Disk cache file for a photo at the current display settings"""
+        key = hashlib.sha1(
+            f"{os.path.abspath(image_path)}|{os.path.getmtime(image_path)}|"
+            f"{self.width}x{self.height}_{self.rotation}_{self.fit_mode}_{self.resample}".encode()
+        ).hexdigest()
+        return self.cache_dir / f"{key}.raw"
+    
+    def _read_disk_cache(self, cache_path: Path):
+        """Return (surface, position) from a cache file, or None on a miss"""
+        try:
+            data = cache_path.read_bytes()
+        except OSError:
+            return None
+        
+        try:
+            width, height, x, y, depth = DISK_CACHE_HEADER.unpack_from(data)
+        except struct.error:
+            depth = None  # shorter than the header
+        pixels = memoryview(data)[DISK_CACHE_HEADER.size:]
+        if depth not in (3, 4) or len(pixels) != width * height * depth:
+            # Truncated or corrupt (e.g. after a power cut): drop it so the
+            # photo is decoded again and the entry rewritten
+            try:
+                cache_path.unlink()
+            except OSError:
+                pass
+            return None
+        mode = 'RGBA' if depth == 4 else 'RGB'
+        return pygame.image.frombuffer(pixels, (width, height), mode), (x, y)
+    
+    def _write_disk_cache(self, cache_path: Path, pil_image, position: Tuple[int, int],
+                          image_bytes: bytes) -> None:
+        """Store processed pixels (pil_image's bytes) in the disk cache"""
+        tmp_path = None
+        try:
+            self.cache_dir.mkdir(exist_ok=True)
+            # Unique temp name: the warm-up, prefetch and main threads can all
+            # be writing the same key at once
+            fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=self.cache_dir)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(DISK_CACHE_HEADER.pack(*pil_image.size, *position, len(pil_image.mode)))
+                f.write(image_bytes)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write display cache {cache_path}: {e}")
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+    
+    def _disk_cache_entries(self) -> List[Tuple[float, int, str]]:
+        """(mtime, size, path) of every disk cache file"""
+        try:
+            with os.scandir(self.cache_dir) as it:
+                return [(e.stat().st_mtime, e.stat().st_size, e.path)
+                        for e in it if e.name.endswith('.raw')]
+        except OSError:
+            return []
+    
+    def _evict_disk_cache(self) -> None:
+        """Remove the oldest cache files once the cache exceeds its size limit"""
+        entries = self._disk_cache_entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= DISK_CACHE_MAX_BYTES:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+    
+    def _warm_disk_cache(self) -> None:
+        """Fill the disk cache for photos not yet in it, up to the size limit
+        (run in the background)"""
+        total = sum(size for _, size, _ in self._disk_cache_entries())
+        for photo_path in list(self.photos):
+            if not self.running:
+                break
+            # A library bigger than the cache would otherwise be rewritten to
+            # the SD card on every start, only to be evicted again
+            if total >= DISK_CACHE_MAX_BYTES:
+                logger.info("Display cache is full, not warming the remaining photos")
+                break
+            try:
+                cache_path = self._disk_cache_path(photo_path)
+                if not cache_path.exists():
+                    self.load_and_process_image(photo_path)
+                    total += cache_path.stat().st_size
+            except OSError:
+                continue
+        self._evict_disk_cache()
+    
     def load_and_process_image(self, image_path: str):
         """Load image and process for display"""
         try:
+            cache_path = self._disk_cache_path(image_path)
+            cached = self._read_disk_cache(cache_path)
+            if cached is not None:
+                return cached
+            
             # Load with PIL
             pil_image = Image.open(image_path)
-            
-            # Convert to RGB if needed
-            if pil_image.mode not in ('RGB', 'RGBA'):
-                pil_image = pil_image.convert('RGB')
-            
-            # Apply EXIF rotation
-            pil_image = ImageOps.exif_transpose(pil_image)
-            
-            # Apply configured rotation
-            if self.rotation != 0:
+            exif = pil_image.getexif()
+            orientation = exif.get(0x0112, 1) if exif else 1
+            
+            # Let libjpeg decode JPEGs at 1/2, 1/4 or 1/8 scale while still
+            # covering the display (no-op for other formats). Orientations 5-8
+            # and 90/270 rotations swap the axes before the resize.
+            sideways = (orientation in (5, 6, 7, 8)) != (self.rotation % 180 == 90)
+            pil_image.draft('RGB', (self.height, self.width) if sideways else (self.width, self.height))
+            
+            # Flatten to RGB up front: the frame shows everything on black, so an
+            # alpha channel would only add a quarter more bytes to every step
+            if pil_image.mode != 'RGB':
+                if pil_image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in pil_image.info:
+                    rgba = pil_image.convert('RGBA')
+                    pil_image = Image.new('RGB', rgba.size)
+                    pil_image.paste(rgba, mask=rgba.getchannel('A'))
+                else:
+                    pil_image = pil_image.convert('RGB')
+            
+            # EXIF orientation and configured rotation combine into one lossless
+            # transpose, applied after the resize so it only touches display-sized
+            # pixels (None when the net result is identity). Other angles need
+            # a real rotate on the full image first.
+            transpose = None
+            if self.rotation % 90 == 0:
+                transpose = _combined_transpose(orientation, self.rotation % 360)
+            else:
+                if orientation != 1:
+                    pil_image = ImageOps.exif_transpose(pil_image)
                 pil_image = pil_image.rotate(-self.rotation, expand=True)
-            
-            # Get original dimensions BEFORE any squishing
+            swap_axes = transpose in (Image.Transpose.ROTATE_90, Image.Transpose.ROTATE_270,
+                                      Image.Transpose.TRANSPOSE, Image.Transpose.TRANSVERSE)
+            
+            # Cheap integer box downscale first while the image is still at least
+            # twice the display size, so the resample filter has less to read
+            # (draft() already did this for JPEGs; this covers PNG and others)
+            src_width, src_height = (self.height, self.width) if swap_axes else (self.width, self.height)
+            reduce_factor = min(pil_image.width // (src_width * 2), pil_image.height // (src_height * 2))
+            if reduce_factor >= 2:
+                pil_image = pil_image.reduce(reduce_factor)
+            
+            # Get original dimensions BEFORE any squishing, as they will appear on screen
             orig_width, orig_height = pil_image.size
+            if swap_axes:
+                orig_width, orig_height = orig_height, orig_width
             img_ratio = orig_width / orig_height
             display_ratio = self.width / self.height
             
-            logger.info(f"Original image size: {orig_width}x{orig_height} (ratio: {img_ratio:.3f})")
-            logger.info(f"Display ratio: {display_ratio:.3f}")
-            
-            logger.info(f"Processing image: {orig_width}x{orig_height} (ratio: {img_ratio:.2f}) for display: {self.width}x{self.height} (ratio: {display_ratio:.2f})")
+            logger.debug("Processing image: %dx%d (ratio: %.3f) for display: %dx%d (ratio: %.3f)",
+                         orig_width, orig_height, img_ratio, self.width, self.height, display_ratio)
             
             if self.fit_mode == "cover":
                 # COVER MODE: Fill entire screen with proper centering
-                # Step 1: Determine center crop area based on ORIGINAL image dimensions
-                
+                # Size of the largest centered area with the display's aspect ratio
                 if img_ratio > display_ratio:
                     # Image is wider than display ratio - crop horizontally (keep full height)
-                    target_width = int(orig_height * display_ratio)
-                    target_height = orig_height
-                    crop_left = (orig_width - target_width) // 2
-                    crop_top = 0
+                    crop_width = orig_height * display_ratio
+                    crop_height = orig_height
                 else:
-                    # Image is taller than display ratio - crop vertically (keep full width)  
-                    target_width = orig_width
-                    target_height = int(orig_width / display_ratio)
-                    crop_left = 0
-                    crop_top = (orig_height - target_height) // 2
-                
-                crop_right = crop_left + target_width
-                crop_bottom = crop_top + target_height
+                    # Image is taller than display ratio - crop vertically (keep full width)
+                    crop_width = orig_width
+                    crop_height = orig_width / display_ratio
                 
-                logger.info(f"Step 1 - Center crop based on original: ({crop_left}, {crop_top}, {crop_right}, {crop_bottom})")
-                logger.info(f"Cropping from {orig_width}x{orig_height} to {target_width}x{target_height}")
-                
-                # Apply the center crop
-                pil_image = pil_image.crop((crop_left, crop_top, crop_right, crop_bottom))
-                
-                # Step 2: Apply counter-squish to the cropped image
+                # Counter-squish: narrow the image horizontally by the squish
+                # factor, which means only the central squish_factor of the
+                # crop's height still fits on screen
                 squish_factor = 0.9
-                squished_width = int(pil_image.size[0] * squish_factor)
-                squished_height = pil_image.size[1]
-                
-                logger.info(f"Step 2 - Counter-squish: {pil_image.size[0]}x{pil_image.size[1]} → {squished_width}x{squished_height} (factor: {squish_factor})")
-                
-                pil_image = pil_image.resize((squished_width, squished_height), Image.Resampling.LANCZOS)
+                visible_height = crop_height * squish_factor
+                box = (
+                    (orig_width - crop_width) / 2,
+                    (orig_height - visible_height) / 2,
+                    (orig_width + crop_width) / 2,
+                    (orig_height + visible_height) / 2,
+                )
                 
-                # Step 3: Scale to final display size
-                final_scale_x = self.width / squished_width
-                final_scale_y = self.height / squished_height
-                final_scale = max(final_scale_x, final_scale_y)  # Ensure we fill the screen
+                logger.debug("Cover crop box: (%.1f, %.1f, %.1f, %.1f) (squish: %s)", *box, squish_factor)
                 
-                final_width = int(squished_width * final_scale)
-                final_height = int(squished_height * final_scale)
-                
-                logger.info(f"Step 3 - Final scale: {final_scale:.3f}, Final size: {final_width}x{final_height}")
-                
-                pil_image = pil_image.resize((final_width, final_height), Image.Resampling.LANCZOS)
-                
-                # Step 4: Final crop to exact display size if needed
-                if final_width > self.width or final_height > self.height:
-                    final_crop_left = max(0, (final_width - self.width) // 2)
-                    final_crop_top = max(0, (final_height - self.height) // 2)
-                    final_crop_right = final_crop_left + self.width
-                    final_crop_bottom = final_crop_top + self.height
-                    
-                    logger.info(f"Step 4 - Final crop: ({final_crop_left}, {final_crop_top}, {final_crop_right}, {final_crop_bottom})")
-                    pil_image = pil_image.crop((final_crop_left, final_crop_top, final_crop_right, final_crop_bottom))
+                # Crop, squish and scale in a single resampling pass. The box is
+                # centered, so in source pixels it only needs its axes swapped.
+                if swap_axes:
+                    pil_image = pil_image.resize((self.height, self.width), self.resample,
+                                                 box=(box[1], box[0], box[3], box[2]))
+                else:
+                    pil_image = pil_image.resize((self.width, self.height), self.resample, box=box)
                 
                 # Position at top-left
                 x, y = 0, 0
@@ -276,38 +522,35 @@ class DisplayManager:
                 scale_for_width = self.width / orig_width
                 scale_for_height = self.height / orig_height
                 
-                logger.info(f"Scale factors: width={scale_for_width:.6f}, height={scale_for_height:.6f}")
-                
                 # Use the SMALLER scale factor to ensure we fit within the screen
                 scale_factor = min(scale_for_width, scale_for_height)
-                logger.info(f"Using min scale factor: {scale_factor:.6f}")
                 
                 new_width = int(orig_width * scale_factor)
                 new_height = int(orig_height * scale_factor)
                 
-                logger.info(f"Scaled dimensions: {new_width}x{new_height}")
-                
                 # Resize image
-                pil_image = pil_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+                pil_image = pil_image.resize((new_height, new_width) if swap_axes else (new_width, new_height),
+                                             self.resample)
                 
                 # Calculate position to center image
                 x = (self.width - new_width) // 2
                 y = (self.height - new_height) // 2
                 
-                logger.info(f"Centering at position: ({x}, {y})")
-                logger.info(f"Black bars: left/right={x}px, top/bottom={y}px")
+                logger.debug("Contain: scale %.6f -> %dx%d at (%d, %d)", scale_factor, new_width, new_height, x, y)
             
-            # Convert to pygame surface
-            if pil_image.mode == 'RGBA':
-                image_str = pil_image.tobytes()
-                pygame_image = pygame.image.fromstring(image_str, pil_image.size, 'RGBA')
-            else:
-                image_str = pil_image.tobytes()
-                pygame_image = pygame.image.fromstring(image_str, pil_image.size, 'RGB')
+            if transpose is not None:
+                pil_image = pil_image.transpose(transpose)
+            
+            # Convert to pygame surface (frombuffer wraps the bytes instead of
+            # copying them; the Surface keeps the buffer alive)
+            image_bytes = pil_image.tobytes()
+            pygame_image = pygame.image.frombuffer(image_bytes, pil_image.size, 'RGB')
+            
+            self._write_disk_cache(cache_path, pil_image, (x, y), image_bytes)
             
             # Verify final image dimensions match what we expect
             final_size = pygame_image.get_size()
-            logger.info(f"Final pygame surface size: {final_size[0]}x{final_size[1]}, position: ({x}, {y})")
+            logger.debug("Final pygame surface size: %dx%d, position: (%d, %d)", *final_size, x, y)
             
             return pygame_image, (x, y)
             
@@ -315,67 +558,223 @@ class DisplayManager:
             logger.error(f"Error processing image {image_path}: {e}")
             return None
     
-    def display_photo(self, photo_path: str) -> bool:
+    def _surface_key(self, photo_path: str) -> tuple:
+        """Cache key for a photo at the current display settings"""
+        return (photo_path, os.path.getmtime(photo_path),
+                self.width, self.height, self.rotation, self.fit_mode)
+    
+    def get_prepared_image(self, photo_path: str):
+        """Return (surface, position) for a photo, from the cache when possible"""
+        key = self._surface_key(photo_path)
+        with self._surface_lock:
+            result = self._surface_cache.get(key)
+            if result is not None:
+                self._surface_cache.move_to_end(key)
+                return result
+        
+        result = self.load_and_process_image(photo_path)
+        if result is not None:
+            # Convert once to the display's pixel format so every blit of a
+            # cached surface takes SDL's fast path
+            surface, position = result
+            if self.screen is not None:
+                if surface.get_flags() & pygame.SRCALPHA:
+                    surface = surface.convert_alpha()
+                else:
+                    surface = surface.convert(self.screen)
+                result = surface, position
+            with self._surface_lock:
+                self._surface_cache[key] = result
+                while len(self._surface_cache) > SURFACE_CACHE_SIZE:
+                    self._surface_cache.popitem(last=False)
+        return result
+    
+    def _prepare_next_photo(self) -> None:
+        """Hand the next photo to the background worker so advancing is instant"""
+        if len(self.photos) < 2:
+            return
+        next_path = self.photos[(self.current_photo_index + 1) % len(self.photos)]
+        
+        with self._prep_cond:
+            self._prep_target = next_path
+            self._prep_pending = next_path
+            self._prep_cond.notify()
+        
+        if self._prep_thread is None:
+            self._prep_thread = threading.Thread(target=self._prefetcher, name="prepare-next", daemon=True)
+            self._prep_thread.start()
+    
+    def _prefetcher(self) -> None:
+        """Worker: decode and resize the requested photo, then publish it"""
+        while True:
+            with self._prep_cond:
+                while self._prep_target is None:
+                    self._prep_cond.wait()
+                path, self._prep_target = self._prep_target, None
+            
+            result = None
+            try:
+                result = self.get_prepared_image(path)
+            except Exception as e:
+                # Includes pygame.error from convert(); the worker must survive
+                logger.warning(f"Could not prepare {path}: {e}")
+            finally:
+                # Single slot: a newer result replaces one nobody collected
+                try:
+                    self._prep_queue.get_nowait()
+                except queue.Empty:
+                    pass
+                self._prep_queue.put((path, result))
+                
+                with self._prep_cond:
+                    if self._prep_pending == path:
+                        self._prep_pending = None
+    
+    def _take_prepared(self, photo_path: str):
+        """Wait for the worker if it is still preparing photo_path; None otherwise"""
+        with self._prep_cond:
+            if self._prep_pending != photo_path:
+                return None
+        
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                path, result = self._prep_queue.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                return None
+            if path == photo_path:
+                return result
+    
+    def display_photo(self, photo_path: str, force: bool = False) -> bool:
         """Display a photo on screen"""
+        started = time.perf_counter()
         try:
-            result = self.load_and_process_image(photo_path)
+            # Already on screen (e.g. advancing through a one-photo library)
+            displayed_key = self._surface_key(photo_path)
+            if displayed_key == self._displayed_key and not force:
+                return True
+            
+            # Decoding happens on the worker; at most wait for it to finish
+            result = self._take_prepared(photo_path) or self.get_prepared_image(photo_path)
             if result is None:
                 return False
             
             image_surface, position = result
             surface_size = image_surface.get_size()
-            screen_size = self.screen.get_size()
             
-            logger.info(f"Screen size: {screen_size}, Image surface size: {surface_size}, Position: {position}")
-            
-            # Verify sizes match expectations
-            if surface_size != (self.width, self.height):
+            # Verify sizes match expectations (contain mode letterboxes by design)
+            if self.fit_mode == "cover" and surface_size != (self.width, self.height):
                 logger.warning(f"Size mismatch! Surface: {surface_size}, Expected: {(self.width, self.height)}")
             
-            # Clear screen
-            self.screen.fill((0, 0, 0))
+            # Clear screen, unless the new image paints over everything the
+            # previous one did (the bars around it are still black then)
+            image_rect = pygame.Rect(position, surface_size)
+            if self._last_image_rect is None or not image_rect.contains(self._last_image_rect):
+                self.screen.fill((0, 0, 0))
+            self._last_image_rect = image_rect.clip(self.screen.get_rect())
+            self._last_message_rect = None
             
-            # Draw image - NO scaling, direct blit
-            self.screen.blit(image_surface, position)
+            # Draw image - NO scaling, direct blit (any overlays join this list)
+            self._draw([(image_surface, position)])
             
             # Update display
             pygame.display.flip()
+            self._displayed_key = displayed_key
             
-            # Update current photo indicator for web interface
-            try:
-                current_file = Path('/tmp/rpiframe_current_photo')
-                current_file.write_text(Path(photo_path).name)
-            except Exception as e:
-                logger.warning(f"Failed to update current photo indicator: {e}")
+            # Update current photo indicator for web interface (the web
+            # server is another process, so it still reads this file)
+            photo_name = Path(photo_path).name
+            if photo_name != self.current_photo_name:
+                self.current_photo_name = photo_name
+                try:
+                    Path('/tmp/rpiframe_current_photo').write_text(photo_name)
+                except Exception as e:
+                    logger.warning(f"Failed to update current photo indicator: {e}")
             
-            logger.info(f"Displayed: {Path(photo_path).name}")
+            logger.info("Displayed: %s (%.0fms)", photo_name, (time.perf_counter() - started) * 1000)
+            self._prepare_next_photo()
             return True
             
         except Exception as e:
             logger.error(f"Error displaying photo: {e}")
             return False
     
+    def _draw(self, draws: List[Tuple["pygame.Surface", Tuple[int, int]]]) -> None:
+        """Blit (surface, position) pairs onto the screen in a single call into pygame"""
+        if hasattr(self.screen, "fblits"):
+            self.screen.fblits(draws)
+        else:
+            self.screen.blits(draws, doreturn=False)
+    
+    def _render_message(self, message: str, color) -> List[Tuple["pygame.Surface", "pygame.Rect"]]:
+        """Render each line of a message, centered as a block; cached per message"""
+        key = (message, tuple(color))
+        rendered = self._message_cache.get(key)
+        if rendered is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            if self._font is None:
+                self._font = pygame.font.Font(None, 48)
+            
+            lines = [self._font.render(line, True, color) for line in message.split("\n")]
+            line_height = self._font.get_linesize()
+            top = self.height // 2 - line_height * len(lines) // 2
+            rendered = []
+            for i, surface in enumerate(lines):
+                rect = surface.get_rect(centerx=self.width // 2, top=top + i * line_height)
+                rendered.append((surface, rect))
+            self._message_cache[key] = rendered
+        return rendered
+    
     def display_message(self, message: str, color=(255, 255, 255)) -> None:
         """Display a text message on screen"""
         try:
-            if not pygame.font.get_init():
-                pygame.font.init()
-            
-            font = pygame.font.Font(None, 48)
-            text_surface = font.render(message, True, color)
-            
-            # Center text
-            text_rect = text_surface.get_rect()
-            text_rect.center = (self.width // 2, self.height // 2)
+            rendered = self._render_message(message, color)
+            text_rect = rendered[0][1].unionall([rect for _, rect in rendered])
+            # Whatever was drawn before still has to be cleared on the panel
+            previous = self._last_image_rect or self._last_message_rect
             
             # Clear screen and display message
             self.screen.fill((0, 0, 0))
-            self.screen.blit(text_surface, text_rect)
-            pygame.display.flip()
+            self._last_image_rect = None
+            self._last_message_rect = text_rect
+            self._displayed_key = None
+            self._draw(rendered)
+            if previous is None:
+                # Nothing of ours has been presented yet; the panel may still
+                # hold anything, so push the whole frame
+                pygame.display.flip()
+            else:
+                # Only push the changed area to the panel, not the whole frame
+                pygame.display.update(text_rect.union(previous))
             
         except Exception as e:
             logger.error(f"Error displaying message: {e}")
     
+    def start_control_listener(self) -> None:
+        """Listen for commands from the web server on the control socket"""
+        try:
+            if os.path.exists(DISPLAY_CONTROL_SOCKET):
+                os.unlink(DISPLAY_CONTROL_SOCKET)
+            self._control_socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._control_socket.bind(DISPLAY_CONTROL_SOCKET)
+        except OSError as e:
+            logger.warning(f"Web control unavailable, could not bind {DISPLAY_CONTROL_SOCKET}: {e}")
+            return
+        
+        threading.Thread(target=self._control_listener, name="display-control", daemon=True).start()
+    
+    def _control_listener(self) -> None:
+        """Turn control socket commands into events for the main loop"""
+        while True:
+            try:
+                command = self._control_socket.recv(64)
+            except OSError:
+                break  # socket closed during cleanup
+            if command == b"next":
+                self.next_event.set()
+                pygame.event.post(pygame.event.Event(CONTROL_EVENT))
+    
     def handle_swipe(self, start_pos: Tuple[int, int], end_pos: Tuple[int, int]) -> None:
         """Handle swipe gesture"""
         dx = end_pos[0] - start_pos[0]
@@ -393,7 +792,8 @@ class DisplayManager:
         
         self.current_photo_index = (self.current_photo_index + 1) % len(self.photos)
         self.display_photo(self.photos[self.current_photo_index])
-        self.last_photo_update = time.time()
+        self.last_photo_update = time.monotonic()
+        self._restart_advance_timer()
     
     def previous_photo(self) -> None:
         """Display previous photo"""
@@ -402,7 +802,12 @@ class DisplayManager:
         
         self.current_photo_index = (self.current_photo_index - 1) % len(self.photos)
         self.display_photo(self.photos[self.current_photo_index])
-        self.last_photo_update = time.time()
+        self.last_photo_update = time.monotonic()
+        self._restart_advance_timer()
+    
+    def _restart_advance_timer(self) -> None:
+        """(Re)arm the slideshow timer so the next advance is a full interval away"""
+        pygame.time.set_timer(PHOTO_ADVANCE_EVENT, int(self.slideshow_interval * 1000))
     
     def run(self) -> None:
         """Main display loop"""
@@ -423,73 +828,68 @@ class DisplayManager:
         if self.photos:
             self.current_photo_index = random.randint(0, len(self.photos) - 1)
             self.display_photo(self.photos[self.current_photo_index])
-            self.last_photo_update = time.time()
+            self.last_photo_update = time.monotonic()
         
         self.running = True
         logger.info("Display slideshow started")
+        self.start_control_listener()
+        
+        threading.Thread(target=self._warm_disk_cache, name="warm-cache", daemon=True).start()
+        
+        # Timers and the control listener wake the loop only when there is work
+        self._restart_advance_timer()
+        if not self.start_photo_watcher():
+            pygame.time.set_timer(PHOTO_RELOAD_EVENT, PHOTO_RELOAD_INTERVAL * 1000)
         
         try:
             while self.running:
-                current_time = time.time()
-                
-                # Handle pygame events
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        self.running = False
-                    
-                    elif event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_ESCAPE:
-                            self.running = False
-                        elif event.key == pygame.K_RIGHT or event.key == pygame.K_SPACE:
-                            self.next_photo()
-                        elif event.key == pygame.K_LEFT:
-                            self.previous_photo()
-                        elif event.key == pygame.K_r:
-                            # Reload photos
-                            self.load_photos()
-                    
-                    elif self.enable_touch:
-                        if event.type == pygame.MOUSEBUTTONDOWN:
-                            self.swipe_start_pos = event.pos
-                            self.swipe_start_time = current_time
-                        
-                        elif event.type == pygame.MOUSEBUTTONUP and self.swipe_start_pos:
-                            # Simple touch vs swipe detection
-                            time_diff = current_time - (self.swipe_start_time or 0)
-                            if time_diff < 0.5:  # Quick touch
-                                self.handle_swipe(self.swipe_start_pos, event.pos)
-                            self.swipe_start_pos = None
+                # Sleep until an event arrives (the timeout just bounds the wait)
+                event = pygame.event.wait(1000)
                 
-                # Check for next photo signal from web interface
-                signal_file = Path('/tmp/rpiframe_next_photo')
-                if signal_file.exists():
-                    try:
-                        signal_file.unlink()  # Remove the signal file
-                        self.next_photo()
-                        logger.info("Advanced to next photo via web interface")
-                    except Exception as e:
-                        logger.error(f"Error processing next photo signal: {e}")
+                if event.type == pygame.QUIT:
+                    self.running = False
                 
-                # Auto-advance slideshow
-                if current_time - self.last_photo_update >= self.slideshow_interval:
+                elif event.type == PHOTO_ADVANCE_EVENT:
                     self.next_photo()
                 
-                # Reload photos periodically (every 5 minutes)
-                if not hasattr(self, 'last_photo_reload'):
-                    self.last_photo_reload = current_time
-                
-                if current_time - self.last_photo_reload >= 300:  # 5 minutes
+                elif event.type == PHOTO_RELOAD_EVENT:
+                    # Reload photos to pick up new uploads and deletions
                     old_count = len(self.photos)
                     self.load_photos()
-                    self.last_photo_reload = current_time
                     if len(self.photos) != old_count:
                         logger.info(f"Photo count changed: {old_count} -> {len(self.photos)}")
                         if not self.photos:
                             self.display_message("No photos found!", (255, 100, 100))
                 
-                # Control frame rate
-                if self.clock:
-                    self.clock.tick(30)
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        self.running = False
+                    elif event.key == pygame.K_RIGHT or event.key == pygame.K_SPACE:
+                        self.next_photo()
+                    elif event.key == pygame.K_LEFT:
+                        self.previous_photo()
+                    elif event.key == pygame.K_r:
+                        # Reload photos
+                        self.load_photos()
+                
+                elif self.enable_touch:
+                    if event.type == pygame.MOUSEBUTTONDOWN:
+                        self.swipe_start_pos = event.pos
+                        self.swipe_start_time = time.monotonic()
+                    
+                    elif event.type == pygame.MOUSEBUTTONUP and self.swipe_start_pos:
+                        # Simple touch vs swipe detection
+                        time_diff = time.monotonic() - (self.swipe_start_time or 0)
+                        if time_diff < self.swipe_max_duration:  # Quick touch
+                            self.handle_swipe(self.swipe_start_pos, event.pos)
+                        self.swipe_start_pos = None
+                
+                # Check for next photo request from web interface
+                # (CONTROL_EVENT wakes the wait as soon as one arrives)
+                if self.next_event.is_set():
+                    self.next_event.clear()
+                    self.next_photo()
+                    logger.info("Advanced to next photo via web interface")
                 
         except KeyboardInterrupt:
             logger.info("Display interrupted by user")
@@ -503,6 +903,14 @@ class DisplayManager:
         logger.info("Cleaning up display")
         self.running = False
         
+        if self._control_socket is not None:
+            self._control_socket.close()
+            self._control_socket = None
+            try:
+                os.unlink(DISPLAY_CONTROL_SOCKET)
+            except OSError:
+                pass
+        
         if pygame and pygame.get_init():
             pygame.quit()
         
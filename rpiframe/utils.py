@@ -4,14 +4,45 @@ Common helper functions for logging, directory management, etc.
 """
 
 import os
+import re
+import time
+import socket
 import logging
+import functools
 import logging.handlers
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import FrozenSet, Iterable, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .config import Config
 
+# Datagram socket the display manager listens on for commands from the web server
+DISPLAY_CONTROL_SOCKET = "/tmp/rpiframe_display.sock"
+
+# Log records buffered in memory before a write to the log file
+LOG_BUFFER_CAPACITY = 100
+
+# Units for format_bytes and their sizes
+_BYTE_UNITS = ("B", "KB", "MB", "GB", "TB")
+_BYTE_POWERS = tuple(1024 ** i for i in range(len(_BYTE_UNITS)))
+
+# Seconds get_system_info reuses its last result
+SYSTEM_INFO_TTL = 2.0
+_system_info_cache = {"time": 0.0, "info": None}
+
+# Patterns for safe_filename
+_UNSAFE_CHARS_RE = re.compile(r'[^\w\-_\.]')
+_REPEATED_UNDERSCORES_RE = re.compile(r'_{2,}')
+
+def send_display_command(command: str) -> bool:
+    """Send a command (e.g. "next") to the display manager; False if it isn't listening"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.sendto(command.encode(), DISPLAY_CONTROL_SOCKET)
+        return True
+    except OSError:
+        return False
+
 def setup_logging(config: 'Config') -> None:
     """Setup logging configuration"""
     try:
@@ -23,17 +54,31 @@ def setup_logging(config: 'Config') -> None:
         if log_path.parent != Path("."):
             log_path.parent.mkdir(exist_ok=True)
         
+        log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        
+        # The file is opened on first write, and records are written to the
+        # SD card in batches of LOG_BUFFER_CAPACITY (errors go out at once).
+        # logging.shutdown() flushes whatever is still buffered.
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=10*1024*1024,  # 10MB
+            backupCount=5,
+            delay=True
+        )
+        file_handler.setFormatter(logging.Formatter(log_format))
+        buffered_handler = logging.handlers.MemoryHandler(
+            LOG_BUFFER_CAPACITY,
+            flushLevel=logging.ERROR,
+            target=file_handler
+        )
+        
         # Setup logging
         logging.basicConfig(
             level=log_level,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            format=log_format,
             handlers=[
                 logging.StreamHandler(),
-                logging.handlers.RotatingFileHandler(
-                    log_file,
-                    maxBytes=10*1024*1024,  # 10MB
-                    backupCount=5
-                )
+                buffered_handler
             ]
         )
         
@@ -48,35 +93,45 @@ def setup_logging(config: 'Config') -> None:
 def create_directories(config: 'Config') -> None:
     """Create required directories"""
     try:
-        # Photos directory
-        photos_dir = Path(config.photos.get("directory", "photos"))
-        photos_dir.mkdir(exist_ok=True)
-        
-        # Thumbnails directory
-        thumbs_dir = photos_dir / "thumbnails"
-        thumbs_dir.mkdir(exist_ok=True)
-        
-        # Static directories (for web interface)
-        static_dir = Path("static")
-        static_dir.mkdir(exist_ok=True)
-        
-        (static_dir / "css").mkdir(exist_ok=True)
-        (static_dir / "js").mkdir(exist_ok=True)
-        (static_dir / "images").mkdir(exist_ok=True)
-        
-        # Templates directory
-        templates_dir = Path("templates")
-        templates_dir.mkdir(exist_ok=True)
-        
-        # Logs directory
-        logs_dir = Path("logs")
-        logs_dir.mkdir(exist_ok=True)
+        photos_dir = config.photos.get("directory", "photos")
+        # Only leaf directories; makedirs creates the parents (photos, static)
+        required_dirs = (
+            os.path.join(photos_dir, "thumbnails"),
+            # Static directories (for web interface)
+            "static/css",
+            "static/js",
+            "static/images",
+            "templates",
+            "logs",
+        )
+        for dir_path in required_dirs:
+            os.makedirs(dir_path, exist_ok=True)
         
     except Exception as e:
         logging.getLogger(__name__).error(f"Error creating directories: {e}")
 
+def _read_cpu_temp() -> Optional[float]:
+    """CPU temperature in °C from psutil, falling back to the Pi's thermal zone"""
+    try:
+        import psutil
+        for entries in psutil.sensors_temperatures().values():
+            if entries:
+                return entries[0].current
+    except (ImportError, AttributeError, OSError):
+        pass
+    
+    try:
+        with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
+            return int(f.read().strip()) / 1000
+    except (OSError, ValueError):
+        return None
+
 def get_system_info() -> dict:
-    """Get system information"""
+    """Get system information (cached briefly, since the status page polls it)"""
+    now = time.monotonic()
+    if _system_info_cache["info"] is not None and now - _system_info_cache["time"] < SYSTEM_INFO_TTL:
+        return _system_info_cache["info"]
+    
     info = {
         "platform": "unknown",
         "cpu_temp": "N/A",
@@ -88,13 +143,10 @@ def get_system_info() -> dict:
         import platform
         info["platform"] = platform.system()
         
-        # CPU temperature (Raspberry Pi specific)
-        try:
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                temp_raw = int(f.read().strip())
-                info["cpu_temp"] = f"{temp_raw / 1000:.1f}°C"
-        except:
-            pass
+        # CPU temperature
+        cpu_temp = _read_cpu_temp()
+        if cpu_temp is not None:
+            info["cpu_temp"] = f"{cpu_temp:.1f}°C"
         
         # Disk usage
         try:
@@ -134,6 +186,8 @@ def get_system_info() -> dict:
     except Exception as e:
         logging.getLogger(__name__).error(f"Error getting system info: {e}")
     
+    _system_info_cache["time"] = time.monotonic()
+    _system_info_cache["info"] = info
     return info
 
 def format_bytes(bytes_value: int) -> str:
@@ -141,35 +195,37 @@ def format_bytes(bytes_value: int) -> str:
     if bytes_value == 0:
         return "0B"
     
-    units = ["B", "KB", "MB", "GB", "TB"]
-    i = 0
-    value = float(bytes_value)
-    
-    while value >= 1024 and i < len(units) - 1:
-        value /= 1024
-        i += 1
-    
-    return f"{value:.1f} {units[i]}"
+    # Every 10 bits is one 1024x unit step (fractions of a byte stay in B)
+    i = min(max((int(bytes_value).bit_length() - 1) // 10, 0), len(_BYTE_UNITS) - 1)
+    return f"{bytes_value / _BYTE_POWERS[i]:.1f} {_BYTE_UNITS[i]}"
+
+@functools.lru_cache(maxsize=4)
+def _extension_set(allowed_extensions: Iterable[str]) -> FrozenSet[str]:
+    """Lowercased extensions, built once per distinct configuration"""
+    return frozenset(ext.lower() for ext in allowed_extensions)
 
-def is_image_file(filename: str, allowed_extensions: list) -> bool:
+def is_image_file(filename: str, allowed_extensions: Iterable[str]) -> bool:
     """Check if file is an allowed image type"""
     if not filename or '.' not in filename:
         return False
     
+    # Lists aren't hashable; a tuple of them hits the same cache entry
+    if not isinstance(allowed_extensions, (tuple, frozenset)):
+        allowed_extensions = tuple(allowed_extensions)
+    
     extension = filename.rsplit('.', 1)[1].lower()
-    return extension in [ext.lower() for ext in allowed_extensions]
+    return extension in _extension_set(allowed_extensions)
 
 def safe_filename(filename: str) -> str:
     """Create a safe filename by removing/replacing problematic characters"""
-    import re
     from werkzeug.utils import secure_filename
     
     # First pass through werkzeug's secure_filename
     safe_name = secure_filename(filename)
     
     # Additional safety measures
-    safe_name = re.sub(r'[^\w\-_\.]', '_', safe_name)
-    safe_name = re.sub(r'_{2,}', '_', safe_name)  # Replace multiple underscores
+    safe_name = _UNSAFE_CHARS_RE.sub('_', safe_name)
+    safe_name = _REPEATED_UNDERSCORES_RE.sub('_', safe_name)  # Replace multiple underscores
     safe_name = safe_name.strip('_')  # Remove leading/trailing underscores
     
     # Ensure we don't have an empty filename
@@ -7,19 +7,30 @@ import os
 import glob
 import json
 import logging
+import uuid
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, TYPE_CHECKING
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
 
 try:
     from flask import Flask, request, jsonify, render_template, send_from_directory
     from werkzeug.utils import secure_filename
+    from werkzeug.exceptions import RequestEntityTooLarge
     FLASK_AVAILABLE = True
 except ImportError:
     FLASK_AVAILABLE = False
     Flask = None
     logging.getLogger(__name__).warning("Flask not available")
 
+# streaming-form-data parses multipart uploads straight into the destination
+# file instead of Werkzeug spooling the whole body first
+try:
+    from streaming_form_data import StreamingFormDataParser
+    from streaming_form_data.targets import FileTarget
+    STREAMING_UPLOADS_AVAILABLE = True
+except ImportError:
+    STREAMING_UPLOADS_AVAILABLE = False
+
 try:
     from PIL import Image
     PIL_AVAILABLE = True
@@ -30,10 +41,13 @@ except ImportError:
 if TYPE_CHECKING:
     from .config import Config
 
-from .utils import format_bytes, get_system_info, is_image_file, safe_filename
+from .utils import format_bytes, get_system_info, is_image_file, safe_filename, send_display_command
 
 logger = logging.getLogger(__name__)
 
+# Bytes read from the request body per parser call when streaming uploads
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
 class WebServer:
     """Flask web server for photo management"""
     
@@ -85,18 +99,36 @@ class WebServer:
         def upload_photo():
             """Upload new photo"""
             try:
-                if 'file' not in request.files:
-                    return jsonify({'success': False, 'error': 'No file provided'}), 400
-                
-                file = request.files['file']
-                if file.filename == '':
-                    return jsonify({'success': False, 'error': 'No file selected'}), 400
-                
-                if not self._is_allowed_file(file.filename):
-                    return jsonify({'success': False, 'error': 'File type not allowed'}), 400
+                if STREAMING_UPLOADS_AVAILABLE and request.mimetype == 'multipart/form-data':
+                    # Parse the body straight into a file in the photos directory
+                    upload_name, part_path = self._receive_upload_stream()
+                    error = None
+                    if upload_name is None:
+                        error = 'No file provided'
+                    elif upload_name == '':
+                        error = 'No file selected'
+                    elif not self._is_allowed_file(upload_name):
+                        error = 'File type not allowed'
+                    if error:
+                        part_path.unlink(missing_ok=True)
+                        return jsonify({'success': False, 'error': error}), 400
+                    
+                    # Save file
+                    filename = self._save_streamed_file(upload_name, part_path)
+                else:
+                    if 'file' not in request.files:
+                        return jsonify({'success': False, 'error': 'No file provided'}), 400
+                    
+                    file = request.files['file']
+                    if file.filename == '':
+                        return jsonify({'success': False, 'error': 'No file selected'}), 400
+                    
+                    if not self._is_allowed_file(file.filename):
+                        return jsonify({'success': False, 'error': 'File type not allowed'}), 400
+                    
+                    # Save file
+                    filename = self._save_uploaded_file(file)
                 
-                # Save file
-                filename = self._save_uploaded_file(file)
                 if filename:
                     # Generate thumbnail
                     self._generate_thumbnail(filename)
@@ -108,6 +140,8 @@ class WebServer:
                 else:
                     return jsonify({'success': False, 'error': 'Failed to save file'}), 500
                     
+            except RequestEntityTooLarge:
+                return jsonify({'success': False, 'error': 'File too large'}), 413
             except Exception as e:
                 logger.error(f"Error uploading photo: {e}")
                 return jsonify({'success': False, 'error': str(e)}), 500
@@ -223,9 +257,9 @@ class WebServer:
         def next_photo():
             """Advance to next photo in slideshow"""
             try:
-                # Create a signal file that the display manager can detect
-                signal_file = Path('/tmp/rpiframe_next_photo')
-                signal_file.touch()
+                # Tell the display manager directly over its control socket
+                if not send_display_command("next"):
+                    return jsonify({'success': False, 'error': 'Display is not running'}), 503
                 
                 logger.info("Next photo signal sent")
                 return jsonify({'success': True, 'message': 'Next photo signal sent'})
@@ -301,35 +335,79 @@ class WebServer:
         allowed_extensions = self.config.photos.get("allowed_extensions", [])
         return is_image_file(filename, allowed_extensions)
     
+    def _upload_path(self, filename: str) -> Path:
+        """Path in the photos directory for an uploaded file, avoiding existing names"""
+        upload_dir = Path(self.config.photos.get("directory", "photos"))
+        upload_dir.mkdir(exist_ok=True)
+        
+        file_path = upload_dir / safe_filename(filename)
+        
+        # Handle duplicate names
+        counter = 1
+        original_stem = file_path.stem
+        while file_path.exists():
+            file_path = upload_dir / f"{original_stem}_{counter}{file_path.suffix}"
+            counter += 1
+        
+        return file_path
+    
+    def _finish_upload(self, file_path: Path) -> str:
+        """Post-process a saved upload; returns the photo's final filename"""
+        logger.info(f"Saved uploaded file: {file_path.name}")
+        
+        # Convert HEIC/HEIF to JPEG if needed
+        if file_path.suffix.lower() in ['.heic', '.heif']:
+            converted_name = self._convert_heic_to_jpeg(file_path)
+            if converted_name:
+                return converted_name
+        
+        return file_path.name
+    
     def _save_uploaded_file(self, file) -> str:
         """Save uploaded file to photos directory"""
         try:
-            filename = safe_filename(file.filename)
-            upload_dir = Path(self.config.photos.get("directory", "photos"))
-            upload_dir.mkdir(exist_ok=True)
-            
-            file_path = upload_dir / filename
-            
-            # Handle duplicate names
-            counter = 1
-            original_stem = file_path.stem
-            while file_path.exists():
-                file_path = upload_dir / f"{original_stem}_{counter}{file_path.suffix}"
-                counter += 1
-            
+            file_path = self._upload_path(file.filename)
             file.save(str(file_path))
-            logger.info(f"Saved uploaded file: {file_path.name}")
-            
-            # Convert HEIC/HEIF to JPEG if needed
-            if file_path.suffix.lower() in ['.heic', '.heif']:
-                converted_name = self._convert_heic_to_jpeg(file_path)
-                if converted_name:
-                    return converted_name
+            return self._finish_upload(file_path)
             
-            return file_path.name
+        except Exception as e:
+            logger.error(f"Error saving uploaded file: {e}")
+            return ""
+    
+    def _receive_upload_stream(self) -> Tuple[Optional[str], Path]:
+        """Stream the multipart request body's "file" field to a temporary file in
+        the photos directory; returns (client filename or None, temporary path)"""
+        upload_dir = Path(self.config.photos.get("directory", "photos"))
+        upload_dir.mkdir(exist_ok=True)
+        # Hidden and without an image extension, so nothing lists it as a photo
+        part_path = upload_dir / f".upload-{uuid.uuid4().hex}.part"
+        
+        target = FileTarget(str(part_path))
+        parser = StreamingFormDataParser(headers={'Content-Type': request.content_type})
+        parser.register('file', target)
+        try:
+            # request.stream enforces MAX_CONTENT_LENGTH as it is read
+            while True:
+                chunk = request.stream.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                parser.data_received(chunk)
+        except BaseException:
+            part_path.unlink(missing_ok=True)
+            raise
+        
+        return target.multipart_filename, part_path
+    
+    def _save_streamed_file(self, upload_name: str, part_path: Path) -> str:
+        """Move a streamed upload into place under its final name"""
+        try:
+            file_path = self._upload_path(upload_name)
+            os.replace(part_path, file_path)
+            return self._finish_upload(file_path)
             
         except Exception as e:
             logger.error(f"Error saving uploaded file: {e}")
+            part_path.unlink(missing_ok=True)
             return ""
     
     def _generate_thumbnail(self, filename: str) -> bool:
@@ -424,9 +502,18 @@ class WebServer:
             if not photo_path:
                 return False
             
-            # Rotate image
+            # Rotate image clockwise; right angles are an exact, much faster
+            # pixel transpose rather than a resampled affine rotate
+            transposes = {
+                90: Image.Transpose.ROTATE_270,
+                180: Image.Transpose.ROTATE_180,
+                270: Image.Transpose.ROTATE_90,
+            }
             with Image.open(photo_path) as img:
-                rotated = img.rotate(-degrees, expand=True)
+                if degrees % 360 in transposes:
+                    rotated = img.transpose(transposes[degrees % 360])
+                else:
+                    rotated = img.rotate(-degrees, expand=True)
                 rotated.save(photo_path)
             
             # Regenerate thumbnail
@@ -67,7 +67,10 @@ class ImageProcessor:
                 img = img.convert('RGB')
             
             # Remove EXIF orientation and apply it to the image
-            img = ImageOps.exif_transpose(img)
+            # (skipped when orientation is normal, avoiding a full image copy)
+            exif = img.getexif()
+            if exif and exif.get(0x0112, 1) != 1:
+                img = ImageOps.exif_transpose(img)
             
             # Resize if too large (to save storage)
             if max(img.size) > self.max_dimension: